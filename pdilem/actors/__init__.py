@@ -1,8 +1,10 @@
 """Actor implementations and utility"""
 
+from pdilem.actors.fsm import FSM, FSMActor
 from pdilem.actors.human import HumanActor
 from pdilem.actors.tft import TFTActor, GTFTActor
 from pdilem.actors.always import ACActor, ADActor
 from pdilem.actors.grimtrigger import GTActor
 from pdilem.actors.random import RandActor
 from pdilem.actors.drl import DRLActor
+from pdilem.actors.numpydrl import NumpyDRLActor
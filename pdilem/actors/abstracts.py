@@ -1,9 +1,14 @@
 """Abstract classes for PD actors"""
 
+import copy
 from abc import ABC, abstractmethod
 from enum import IntEnum
 
-from typing import TypeVar
+from typing import Hashable, TypeVar
+
+import numpy as np
+
+from pdilem.payoff import PAYOFF
 
 T = TypeVar("T", bound="Actor")
 
@@ -22,15 +27,9 @@ class Move(IntEnum):
     COOPERATE = 0
     DEFECT = 1
 
-    def score(self, other: "Move") -> int:
+    def score(self, other: "Move", payoff: np.ndarray = PAYOFF) -> int:
         """Return the score for this move against the other move"""
-        if self == Move.COOPERATE:
-            if other == Move.COOPERATE:
-                return 2
-            return 0
-        if other == Move.COOPERATE:
-            return 3
-        return 1
+        return int(payoff[self, other])
 
     def to_int(self) -> int:
         """Return the integer value of the move"""
@@ -55,6 +54,9 @@ class Move(IntEnum):
 class Actor(ABC):
     """An actor in a Prisoner's Dilemma game"""
 
+    # Subclasses without `__slots__` get an instance dict as usual
+    __slots__ = ("total_score",)
+
     name: str
     verbose: bool
     cloneable: bool
@@ -75,6 +77,58 @@ class Actor(ABC):
     def reset(self) -> None:
         """Reset the actor's state"""
 
+    @property
+    def deterministic(self) -> bool:
+        """Whether the actor's moves are a function of the game so far"""
+        return False
+
+    def seed(self, seed: int | np.random.SeedSequence | None = None) -> None:
+        """Reseed the actor's own random stream, if it has one"""
+
+    def state_key(self) -> Hashable | None:
+        """
+        Return a hashable key identifying the actor's state for memoized
+        lookahead, or None if the actor's moves cannot be memoized (e.g.
+        stochastic or unknown internal state)
+        """
+        return None
+
+    def identity(self) -> str | None:
+        """
+        Return a stable description of everything that determines the actor's
+        play (class, parameters, model file contents, not its name), for
+        caching results across runs, or None if it cannot be described (e.g. a
+        human)
+        """
+        return None
+
+    def snapshot(self) -> Hashable:
+        """
+        Return an immutable, hashable token of the actor's strategy state (not
+        its total score), which `restore` brings the actor back to
+
+        Search code branches from a token instead of cloning the actor at every
+        node, so cloneable actors must override both methods
+        """
+        raise InvalidCloneError(
+            f"Attempted to snapshot an actor without state tokens: {self.name}"
+        )
+
+    def restore(self, token: Hashable) -> None:
+        """Bring the actor back to the state of a `snapshot` token"""
+        raise InvalidCloneError(
+            f"Attempted to restore an actor without state tokens: {self.name}"
+        )
+
+    def batch(self, size: int, rng: np.random.Generator) -> "ActorBatch":
+        """
+        Return `size` independent, freshly reset copies of the actor with their
+        state held in arrays, for engines that advance many games at once
+
+        Actors without an array representation are copied and driven one by one
+        """
+        return ObjectBatch(self, size, rng)
+
     def clone(self: T) -> T:
         """Return an instance of the actor with the same state (non-verbose)"""
         if not self.cloneable:
@@ -89,3 +143,68 @@ class Actor(ABC):
         """Conditionally print a label for the actor"""
         if self.verbose:
             print(f"{label}: {self.name}")
+
+
+class ActorBatch(ABC):
+    """
+    Independent copies of an actor advanced together as NumPy arrays
+
+    Moves are int8 arrays of `Move` values. Every method acts on the copies
+    selected by `idx` (an index array or slice), defaulting to all of them
+    """
+
+    def __init__(self, actor: Actor, size: int, rng: np.random.Generator):
+        """Initialize a batch of `size` copies of `actor` drawing randomness from `rng`"""
+        self.actor = actor
+        self.size = size
+        self.rng = rng
+
+    @abstractmethod
+    def move(self, idx: np.ndarray | slice = slice(None)) -> np.ndarray:
+        """Return the selected copies' next moves"""
+
+    @abstractmethod
+    def result(
+        self,
+        other: np.ndarray,
+        delta_score: np.ndarray,
+        idx: np.ndarray | slice = slice(None),
+    ) -> None:
+        """Tell the selected copies what happened in the last round"""
+
+    @abstractmethod
+    def reset(self, idx: np.ndarray | slice = slice(None)) -> None:
+        """Reset the selected copies' state"""
+
+    @abstractmethod
+    def actor_at(self, i: int) -> Actor:
+        """Return copy `i` as a standalone actor in the same state"""
+
+
+class ObjectBatch(ActorBatch):
+    """Fallback batch that drives shallow copies of an actor one at a time"""
+
+    def __init__(self, actor: Actor, size: int, rng: np.random.Generator):
+        super().__init__(actor, size, rng)
+        self.actors = [copy.copy(actor) for _ in range(size)]
+        self.reset()
+
+    def _select(self, idx: np.ndarray | slice) -> list[Actor]:
+        if isinstance(idx, slice):
+            return self.actors[idx]
+        return [self.actors[i] for i in idx]
+
+    def move(self, idx=slice(None)):
+        return np.fromiter((actor.move() for actor in self._select(idx)), dtype=np.int8)
+
+    def result(self, other, delta_score, idx=slice(None)):
+        for actor, other_move, score in zip(self._select(idx), other, delta_score):
+            actor.result(Move(int(other_move)), int(score))
+
+    def reset(self, idx=slice(None)):
+        for actor in self._select(idx):
+            actor.reset()
+            actor.total_score = 0
+
+    def actor_at(self, i):
+        return self.actors[i]
@@ -1,51 +1,25 @@
 """Always do X algorithms"""
 
-from pdilem.actors.abstracts import Actor, Move
+from pdilem.actors.fsm import FSM, FSMActor
 
 
-class ACActor(Actor):
+class ACActor(FSMActor):
     """Always cooperate implementation"""
 
+    __slots__ = ()
+
     name = "AC"
     verbose = False
     cloneable = True
-
-    def __init__(self, name: str | None = None, verbose: bool | None = None):
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-
-    def move(self):
-        return Move.COOPERATE
-
-    def result(self, other, delta_score):
-        pass
-
-    def reset(self):
-        pass
+    fsm = FSM([[0, 0]], defect_probs=[0.0])
 
 
-class ADActor(Actor):
+class ADActor(FSMActor):
     """Always defect implementation"""
 
+    __slots__ = ()
+
     name = "AD"
     verbose = False
     cloneable = True
-
-    def __init__(self, name: str | None = None, verbose: bool | None = None):
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-
-    def move(self):
-        return Move.DEFECT
-
-    def result(self, other, delta_score):
-        pass
-
-    def reset(self):
-        pass
+    fsm = FSM([[0, 0]], defect_probs=[1.0])
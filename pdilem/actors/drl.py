@@ -1,17 +1,176 @@
 """Grim trigger algorithm"""
 
+import copy
 import os
 import sys
 import time
+from typing import TYPE_CHECKING, Any, Callable
+
 import numpy as np
 
-from sb3_contrib import RecurrentPPO
+from pdilem.actors.abstracts import Actor, ActorBatch, Move
+from pdilem.checkpoint import CheckpointWriter, checkpoint_dir
+from pdilem.history import MoveHistory, history_length
+from pdilem.modelcache import load_model, model_class, model_digest
+from pdilem.prefixcache import ROOT, PrefixCache, extend
+from pdilem.store import HistoryWriter
+from pdilem.timing import StageTimer
+
+# torch, SB3 and gymnasium are slow to import, so they are only imported once
+# a DRL actor is actually built
+if TYPE_CHECKING:
+    from sb3_contrib import RecurrentPPO
+    from stable_baselines3 import PPO
+
+    from pdilem.env import PDEnv
+
+
+class PolicyActor(Actor):
+    """
+    Actor playing a policy deterministically, one observation at a time
+
+    Subclasses set `model` to an object with the `RecurrentPPO.predict` interface
+    and `prefix_cache` to a `PrefixCache` or None. Feed-forward policies observe
+    a window of past rounds instead (see `pdilem.history`)
+    """
+
+    model: Any
+    prefix_cache: PrefixCache | None = None
+    # Model file the weights were loaded from, None for a model built in memory
+    load_path: str | None = None
+
+    @property
+    def deterministic(self):
+        # Always played deterministically
+        return True
+
+    def move(self):
+        assert self.model is not None, "No model provided for prediction"
+        if self.prefix_cache is not None:
+            cached = self.prefix_cache.get(self.prefix)
+            if cached is not None:
+                action, self.lstm_states = cached
+                self.last_move = Move.from_int(action)
+                return self.last_move
+        episode_starts = np.ones((1,), dtype=bool)
+        action, self.lstm_states = self.model.predict(
+            self.observation,
+            state=self.lstm_states,
+            episode_start=episode_starts,
+            deterministic=True,
+        )
+        if self.prefix_cache is not None:
+            self.prefix_cache.put(self.prefix, (int(action[0]), self.lstm_states))
+        self.last_move = Move.from_int(action[0])
+        return self.last_move
+
+    def result(self, other, delta_score):
+        if self.history is not None:
+            self.history.push(self.last_move, other, 0)
+            self.observation = self.history.observation(0)
+        else:
+            self.observation = np.array([other.to_int()])
+        self.prefix = extend(self.prefix, other)
+
+    def reset(self):
+        length = self.history_len
+        self.history = MoveHistory(length) if length else None
+        self.observation = (
+            self.history.observation(0) if self.history is not None else np.array([2])
+        )
+        self.lstm_states = None
+        self.last_move = Move.COOPERATE
+        self.prefix = ROOT
+
+    @property
+    def recurrent(self) -> bool:
+        """Whether the policy carries LSTM states from one move to the next"""
+        assert self.model is not None, "No model provided for prediction"
+        return hasattr(self.model.policy, "lstm_hidden_state_shape")
+
+    @property
+    def history_len(self) -> int:
+        """Number of past rounds the policy observes, 0 for the last opponent move"""
+        if self.model is None:
+            return 0
+        return history_length(self.model.observation_space)
+
+    @property
+    def lstm_hidden_state_shape(self) -> tuple[int, int, int]:
+        """Shape of the LSTM states of one game"""
+        assert self.model is not None, "No model provided for prediction"
+        return self.model.policy.lstm_hidden_state_shape
+
+    def batch(self, size, rng):
+        return DRLBatch(self, size, rng)
+
+    def identity(self):
+        if self.load_path is None:
+            return None
+        return self.file_identity(self.load_path)
 
-from pdilem.actors.abstracts import Actor, Move
-from pdilem.env import PDEnv
+    @classmethod
+    def file_identity(cls, path: str) -> str:
+        """Identity of an actor of this class playing the model file at `path`"""
+        return f"{cls.__module__}.{cls.__qualname__}:{model_digest(path)}"
 
 
-class DRLActor(Actor):
+def predict_moves(actors: list[PolicyActor]) -> list[Move]:
+    """
+    Play the next move of every actor, as `PolicyActor.move` would, with a single
+    batched forward pass for those whose move is not in their prefix cache
+
+    Args:
+        - actors (list[PolicyActor]): Actors of different games sharing one model
+
+    Returns:
+        - list[Move]: The move of every actor
+    """
+    model = actors[0].model
+    assert model is not None, "No model provided for prediction"
+    assert all(actor.model is model for actor in actors), "Models must be shared"
+    misses = []
+    for actor in actors:
+        cached = None
+        if actor.prefix_cache is not None:
+            cached = actor.prefix_cache.get(actor.prefix)
+        if cached is None:
+            misses.append(actor)
+            continue
+        action, actor.lstm_states = cached
+        actor.last_move = Move.from_int(action)
+    if not misses:
+        return [actor.last_move for actor in actors]
+
+    observation = np.concatenate([actor.observation for actor in misses])
+    state = None
+    if actors[0].recurrent:
+        n_layers, _, hidden_size = actors[0].lstm_hidden_state_shape
+        zeros = np.zeros((n_layers, 1, hidden_size), dtype=np.float32)
+        states = [actor.lstm_states or (zeros, zeros) for actor in misses]
+        state = (
+            np.concatenate([hidden for hidden, _ in states], axis=1),
+            np.concatenate([cell for _, cell in states], axis=1),
+        )
+    action, state = model.predict(
+        observation,
+        state=state,
+        episode_start=np.ones(len(misses), dtype=bool),
+        deterministic=True,
+    )
+    for j, actor in enumerate(misses):
+        if state is not None:
+            actor.lstm_states = (
+                state[0][:, j : j + 1].copy(),
+                state[1][:, j : j + 1].copy(),
+            )
+        if actor.prefix_cache is not None:
+            actor.prefix_cache.put(actor.prefix, (int(action[j]), actor.lstm_states))
+        actor.last_move = Move.from_int(action[j])
+    return [actor.last_move for actor in actors]
+
+
+class DRLActor(PolicyActor):
     """DRL implementation"""
 
     name = "DRL"
@@ -22,8 +181,10 @@ class DRLActor(Actor):
         self,
         name: str | None = None,
         verbose: bool | None = None,
-        model: RecurrentPPO | str | None = None,
+        model: "RecurrentPPO | PPO | str | None" = None,
         *args,
+        prefix_cache: PrefixCache | None = None,
+        feedforward: bool = False,
         **kwargs,
     ):
         """
@@ -32,8 +193,13 @@ class DRLActor(Actor):
         Args:
             - name (str | None): The name of the actor, or None to use the default name
             - verbose (bool | None): Whether to print prompts
-            - model (RecurrentPPO | str | None): The model to use, a path to load from,
-            or None if a new model will be trained
+            - model (RecurrentPPO | PPO | str | None): The model to use, a path to
+            load from, or None if a new model will be trained
+            - prefix_cache (PrefixCache | None): Cache of moves by opponent-move
+            prefix, skipping the network on repeated games (not for training)
+            - feedforward (bool): Whether a new model is a feed-forward `PPO`
+            policy rather than a recurrent one, it should then observe a window
+            of past rounds (`history_len` environment keyword argument)
             - args (tuple): Arguments for the environment
             - kwargs (dict): Keyword arguments for the environment
         """
@@ -47,29 +213,114 @@ class DRLActor(Actor):
         self.kwargs = kwargs
 
         self.env = None
+        self._env_timer: StageTimer | None = None
         self.load_path = None
 
         if isinstance(model, str):
             self.load_path = model
             try:
-                model = RecurrentPPO.load(model)
+                # Weights are shared with every actor loading the same file
+                model = load_model(model)
             except FileNotFoundError:
                 print(f"Could not load model from {model}")
                 sys.exit(1)
 
         self.model = model
-        self.lstm_states = None
-        self.observation = np.array([2])
+        self.prefix_cache = prefix_cache
+        self.feedforward = feedforward
+        if self.model is not None:
+            # The environment must produce the observations the model was trained on
+            self.kwargs["history_len"] = self.history_len
+        self.reset()
 
-    def _generate_env(self) -> None:
-        """Generate the environment if it does not exist"""
+    def _generate_env(
+        self,
+        n_envs: int = 1,
+        n_workers: int = 0,
+        start_method: str | None = None,
+        timed: bool = False,
+        history_writer: HistoryWriter | None = None,
+        history_metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Generate the environment if it does not exist
+
+        Args:
+            - n_envs (int): Number of episodes to step in parallel, a natively
+            batched `PDVecEnv` is used when greater than 1
+            - n_workers (int): Number of subprocess workers each running its own
+            `PDEnv`, or 0 to run the environment in this process
+            - start_method (str | None): Multiprocessing start method for the
+            workers, or None for the platform default
+            - timed (bool): Whether the environments time their stages, with a
+            `StageTimer` in their `timer` attribute
+            - history_writer (HistoryWriter | None): Store to record finished
+            episodes in, not supported with workers (see `PDEnv`)
+            - history_metadata (dict | None): Details recorded with every episode
+        """
         if self.env is not None:
             return
-        self.env = PDEnv(*self.args, **self.kwargs)
+
+        from stable_baselines3.common.vec_env import SubprocVecEnv, VecMonitor
+
+        from pdilem.env import PDEnv
+        from pdilem.vecenv import PDVecEnv
+
+        kwargs = dict(self.kwargs)
+        if history_writer is not None:
+            kwargs["history_writer"] = history_writer
+            kwargs["history_metadata"] = history_metadata
+        if n_workers > 0:
+            env_fns: list[Callable[[], Any]] = [
+                self._env_fn(timed) for _ in range(n_workers)
+            ]
+            self.env = VecMonitor(SubprocVecEnv(env_fns, start_method=start_method))
+        elif n_envs > 1:
+            kwargs["timer"] = StageTimer() if timed else None
+            self.env = VecMonitor(PDVecEnv(*self.args, num_envs=n_envs, **kwargs))
+        else:
+            kwargs["timer"] = StageTimer() if timed else None
+            self.env = PDEnv(*self.args, **kwargs)
+        self._env_timer = kwargs.get("timer")
+
+    def _env_timers(self) -> list[StageTimer]:
+        """Return the current stage timers of the environments (see `_generate_env`)"""
+        if self._env_timer is not None:
+            return [self._env_timer]
+        from stable_baselines3.common.vec_env import VecEnv
+
+        assert isinstance(self.env, VecEnv)
+        # Copies of the subprocess workers' timers
+        return [timer for timer in self.env.get_attr("timer") if timer is not None]
+
+    def _env_fn(self, timed: bool = False) -> Callable[[], "PDEnv"]:
+        """
+        Return a picklable constructor for a worker's environment
+
+        Opponents are the worker's own unpickled copies, reseeded from the
+        worker's seed (offset by its rank) at the first reset
+        """
+        args, kwargs = self.args, self.kwargs
+
+        def make_env() -> "PDEnv":
+            from pdilem.env import PDEnv
+
+            return PDEnv(*args, timer=StageTimer() if timed else None, **kwargs)
+
+        return make_env
 
     def train(
-        self, save_as: str | None = None, timesteps: int = 100000
-    ) -> RecurrentPPO:
+        self,
+        save_as: str | None = None,
+        timesteps: int = 100000,
+        n_envs: int = 1,
+        n_workers: int = 0,
+        start_method: str | None = None,
+        log_dir: str | None = None,
+        checkpoint_every: int = 0,
+        keep_checkpoints: int = 3,
+        history_store: str | None = None,
+    ) -> "RecurrentPPO | PPO":
         """
         Train a model
         - If there is a provided model, continue training it
@@ -78,52 +329,260 @@ class DRLActor(Actor):
         Args:
             - save_as (str | None): The path to save the model as, or None to save it
             using the path provided to originally load the model at initialization
+            - timesteps (int): Total number of timesteps to train for
+            - n_envs (int): Number of episodes to collect rollouts from in parallel
+            - n_workers (int): Number of subprocess workers to collect rollouts
+            with, or 0 to collect them in this process
+            - start_method (str | None): Multiprocessing start method for the workers
+            - log_dir (str | None): Directory to record per-stage timings in, as
+            timing.csv and TensorBoard logs, or None to not time training
+            - checkpoint_every (int): Number of timesteps between checkpoints
+            written in the background (see `pdilem.checkpoint`), or 0 for none
+            - keep_checkpoints (int): Number of most recent checkpoints to keep
+            - history_store (str | None): Directory of a store to record every
+            training episode in (see `pdilem.store`), with the agent's name,
+            model path and episode seed, or None to not record them. Not
+            supported with workers
 
         Returns:
-            - RecurrentPPO: The trained model
+            - RecurrentPPO | PPO: The trained model
         """
-        self._generate_env()  # Ensure the environment exists
-        assert self.env is not None, "No environment provided for training"
-
+        seed = time.time_ns() % 2**32
         save_path = save_as or self.load_path
         assert save_path, "No path provided to save the model"
 
+        history_writer = None
+        if history_store is not None:
+            if n_workers > 0:
+                raise ValueError("Episodes cannot be recorded from subprocess workers")
+            history_writer = HistoryWriter(history_store)
+            # Rebuilt to record into the store
+            self.env = None
+        # Ensure the environment exists
+        self._generate_env(
+            n_envs,
+            n_workers,
+            start_method,
+            log_dir is not None,
+            history_writer,
+            {"agent": self.name, "model": save_path},
+        )
+        assert self.env is not None, "No environment provided for training"
+
         if self.model is None:
             print(f"Training new model and saving to `{save_path}`")
-            self.model = RecurrentPPO("MlpLstmPolicy", self.env, verbose=1)
+            if self.feedforward:
+                from stable_baselines3 import PPO
+
+                self.model = PPO(
+                    "MlpPolicy", self.env, verbose=1, tensorboard_log=log_dir
+                )
+            else:
+                from sb3_contrib import RecurrentPPO
+
+                self.model = RecurrentPPO(
+                    "MlpLstmPolicy", self.env, verbose=1, tensorboard_log=log_dir
+                )
         else:
             print(f"Continuing training of existing model and saving to `{save_path}`")
+            if self.load_path is not None:
+                # Train a private copy, not the weights shared through the cache
+                self.model = model_class(self.load_path).load(self.load_path)
             self.model.set_env(self.env)
+            if log_dir is not None:
+                self.model.tensorboard_log = log_dir
 
-        self.model.set_random_seed(time.time_ns() % 2**32)
+        self.model.set_random_seed(seed)
+
+        from pdilem.callbacks import CheckpointCallback, TimingCallback
+
+        callbacks = []
+        writer: CheckpointWriter | None = None
+        if log_dir is not None:
+            callbacks.append(
+                TimingCallback(os.path.join(log_dir, "timing.csv"), self._env_timers)
+            )
+        if checkpoint_every > 0:
+            directory = checkpoint_dir(save_path)
+            print(f"Checkpointing every {checkpoint_every} timesteps to `{directory}`")
+            writer = CheckpointWriter(
+                directory, os.path.basename(directory), keep_checkpoints
+            )
+            callbacks.append(CheckpointCallback(checkpoint_every, writer))
 
         try:
-            self.model.learn(timesteps, progress_bar=True)
+            self.model.learn(timesteps, callback=callbacks, progress_bar=True)
         except KeyboardInterrupt:
             print("Interrupted by user, saving model")
         finally:
+            if history_writer is not None:
+                history_writer.close()
+                # The environment must not record into the closed store
+                self.env = None
+            if writer is not None:
+                # Also on interrupts and errors, where SB3 skips the callbacks'
+                # training end
+                writer.close()
+                if writer.error is not None:
+                    print(f"Could not write a checkpoint: {writer.error}")
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
             self.model.save(save_path)
+            # The weights now match the saved file, which unpickled copies reload
+            self.load_path = save_path
             print(f"Model saved to `{save_path}`")
 
+        if self.prefix_cache is not None:
+            # Cached moves are stale once the weights change
+            self.prefix_cache.clear()
+
         print("Done.")
 
         return self.model
 
-    def move(self):
-        assert self.model is not None, "No model provided for prediction"
-        episode_starts = np.ones((1,), dtype=bool)
-        action, self.lstm_states = self.model.predict(
-            self.observation,
-            state=self.lstm_states,
+    def __getstate__(self):
+        # Models loaded from disk are reloaded rather than pickled (e.g. when
+        # sent to rollout workers as an opponent)
+        state = self.__dict__.copy()
+        # Held in a slot of `Actor`, not in the instance dict
+        state["total_score"] = self.total_score
+        state["env"] = None
+        if self.load_path is not None:
+            state["model"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        if self.model is None and self.load_path is not None:
+            self.model = load_model(self.load_path)
+
+
+class DRLBatch(ActorBatch):
+    """
+    Copies of a DRL actor sharing one model, with observations and LSTM states
+    (or move histories) stacked per game so each round is a single batched
+    forward pass
+    """
+
+    actor: PolicyActor
+
+    def __init__(self, actor: PolicyActor, size, rng):
+        super().__init__(actor, size, rng)
+        assert actor.model is not None, "No model provided for prediction"
+        self.model = actor.model
+        self.prefix_cache = actor.prefix_cache
+        self.prefixes: list[tuple[int, int]] = [ROOT] * size
+        self.observation = np.full(size, 2, dtype=np.int64)
+        self.history = (
+            MoveHistory(actor.history_len, size) if actor.history_len else None
+        )
+        # Last move of every game, recorded in its history with the opponent's
+        self.moves = np.zeros(size, dtype=np.int8)
+        self.lstm_states: tuple[np.ndarray, np.ndarray] | None = None
+        if actor.recurrent:
+            n_layers, _, hidden_size = actor.lstm_hidden_state_shape
+            self.lstm_states = (
+                np.zeros((n_layers, size, hidden_size), dtype=np.float32),
+                np.zeros((n_layers, size, hidden_size), dtype=np.float32),
+            )
+
+    def move(self, idx=slice(None)):
+        idx = np.arange(self.size)[idx]
+        if self.prefix_cache is None:
+            moves = self._predict(idx)
+            self.moves[idx] = moves
+            return moves
+        moves = np.empty(len(idx), dtype=np.int8)
+        misses = []
+        for j, i in enumerate(idx):
+            cached = self.prefix_cache.get(self.prefixes[i])
+            if cached is None:
+                misses.append(j)
+                continue
+            moves[j], state = cached
+            if self.lstm_states is not None:
+                self.lstm_states[0][:, i] = state[0][:, 0]
+                self.lstm_states[1][:, i] = state[1][:, 0]
+        if misses:
+            # Games with the same prefix are in the same state, so the network
+            # runs once per distinct prefix and the others copy its outputs
+            first: dict[tuple[int, int], int] = {}
+            for j in misses:
+                first.setdefault(self.prefixes[idx[j]], j)
+            unique = list(first.values())
+            moves[unique] = self._predict(idx[unique])
+            for j in misses:
+                k = first[self.prefixes[idx[j]]]
+                if k == j:
+                    continue
+                moves[j] = moves[k]
+                if self.lstm_states is not None:
+                    self.lstm_states[0][:, idx[j]] = self.lstm_states[0][:, idx[k]]
+                    self.lstm_states[1][:, idx[j]] = self.lstm_states[1][:, idx[k]]
+            for prefix, j in first.items():
+                i = idx[j]
+                state = None
+                if self.lstm_states is not None:
+                    state = (
+                        self.lstm_states[0][:, i : i + 1].copy(),
+                        self.lstm_states[1][:, i : i + 1].copy(),
+                    )
+                self.prefix_cache.put(prefix, (int(moves[j]), state))
+        self.moves[idx] = moves
+        return moves
+
+    def _predict(self, idx: np.ndarray) -> np.ndarray:
+        """Run the network for the selected games"""
+        if self.history is not None:
+            observation = self.history.observation(idx)
+        else:
+            observation = self.observation[idx]
+        if self.lstm_states is None:
+            action, _ = self.model.predict(observation, deterministic=True)
+            return action.astype(np.int8)
+        episode_starts = np.ones(len(idx), dtype=bool)
+        action, (hidden, cell) = self.model.predict(
+            observation,
+            state=(self.lstm_states[0][:, idx], self.lstm_states[1][:, idx]),
             episode_start=episode_starts,
             deterministic=True,
         )
-        return Move.from_int(action[0])
+        self.lstm_states[0][:, idx] = hidden
+        self.lstm_states[1][:, idx] = cell
+        return action.astype(np.int8)
 
-    def result(self, other, delta_score):
-        self.observation = np.array([other.to_int()])
+    def result(self, other, delta_score, idx=slice(None)):
+        self.observation[idx] = other
+        if self.history is not None:
+            self.history.push(self.moves[idx], other, idx)
+        if self.prefix_cache is not None:
+            for i, other_move in zip(np.arange(self.size)[idx], other):
+                self.prefixes[i] = extend(self.prefixes[i], other_move)
 
-    def reset(self):
-        self.observation = np.array([2])
-        self.lstm_states = None
+    def reset(self, idx=slice(None)):
+        self.observation[idx] = 2
+        if self.history is not None:
+            self.history.clear(idx)
+        if self.lstm_states is not None:
+            self.lstm_states[0][:, idx] = 0
+            self.lstm_states[1][:, idx] = 0
+        if self.prefix_cache is not None:
+            for i in np.arange(self.size)[idx]:
+                self.prefixes[i] = ROOT
+
+    def actor_at(self, i):
+        actor = copy.copy(self.actor)
+        actor.observation = np.array([self.observation[i]])
+        actor.history = None
+        if self.history is not None:
+            actor.history = self.history.take(i)
+            actor.observation = actor.history.observation(0)
+        actor.last_move = Move(self.moves[i])
+        actor.lstm_states = None
+        if self.lstm_states is not None:
+            actor.lstm_states = (
+                self.lstm_states[0][:, i : i + 1].copy(),
+                self.lstm_states[1][:, i : i + 1].copy(),
+            )
+        actor.prefix = self.prefixes[i]
+        return actor
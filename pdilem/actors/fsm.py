@@ -0,0 +1,235 @@
+"""Finite-state-machine strategies"""
+
+import copy
+import json
+from typing import Any, Sequence
+
+import numpy as np
+
+from pdilem.actors.abstracts import Actor, ActorBatch, Move
+from pdilem.rng import BlockRandom, SeedLike
+
+# Indexed by a bool, faster than calling `Move`
+_MOVES = (Move.COOPERATE, Move.DEFECT)
+
+
+class FSM:
+    """
+    Declarative finite-state-machine strategy
+
+    States are integers. In each state the machine defects with a fixed
+    probability, then moves to the next state given the opponent's move
+    """
+
+    def __init__(
+        self,
+        transitions: Sequence[Sequence[int]],
+        defect_probs: Sequence[float],
+        initial: int = 0,
+    ):
+        """
+        Initialize the machine
+
+        Args:
+            - transitions (Sequence): Next state for each state (rows) and
+            opponent move (columns, indexed by `Move` values)
+            - defect_probs (Sequence): Probability of defecting in each state
+            - initial (int): State at the start of a game
+        """
+        self.transitions = np.array(transitions, dtype=np.intp)
+        self.defect_probs = np.array(defect_probs, dtype=np.float64)
+        self.initial = initial
+        n_states = len(self.defect_probs)
+        if self.transitions.shape != (n_states, 2):
+            raise ValueError(
+                f"Expected transitions of shape ({n_states}, 2), "
+                f"got {self.transitions.shape}"
+            )
+        if (
+            not 0 <= initial < n_states
+            or not ((self.transitions >= 0) & (self.transitions < n_states)).all()
+        ):
+            raise ValueError("FSM states must be in range(len(defect_probs))")
+        self.transitions.setflags(write=False)
+        self.defect_probs.setflags(write=False)
+        self.deterministic = bool(np.isin(self.defect_probs, (0.0, 1.0)).all())
+        # Python lists are faster than arrays for the scalar path
+        self._transitions = self.transitions.tolist()
+        self._defect_probs = self.defect_probs.tolist()
+        self._key = (
+            tuple(map(tuple, self._transitions)),
+            tuple(self._defect_probs),
+            initial,
+        )
+
+    @property
+    def n_states(self) -> int:
+        """Number of states"""
+        return len(self._defect_probs)
+
+    def move(self, state: int, rng: BlockRandom | None = None) -> Move:
+        """Return the move in a state, sampled from `rng` if the state is stochastic"""
+        prob = self._defect_probs[state]
+        if prob == 0.0 or prob == 1.0:
+            return _MOVES[prob == 1.0]
+        assert rng is not None, "Stochastic states need a random stream"
+        return _MOVES[rng.random() < prob]
+
+    def next_state(self, state: int, other: Move) -> int:
+        """Return the state after the opponent's move"""
+        return self._transitions[state][other]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FSM) and self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+
+# Attributes of `FSMActor` with a class default, overridden per instance
+_SLOTTED = ("name", "verbose", "fsm")
+
+
+class _SlotDefault:
+    """
+    `FSMActor` attribute held in the slot `_<attribute>` of every instance, with
+    the class default as its value on the class (e.g. `TFTActor.name`)
+    """
+
+    def __init__(self, attribute: str):
+        self.slot = f"_{attribute}"
+        self.default = f"_default_{attribute}"
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            return getattr(owner, self.default)
+        return getattr(obj, self.slot)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        setattr(obj, self.slot, value)
+
+
+def _move_defaults(cls: type) -> None:
+    """Move the class defaults declared by an `FSMActor` class out of the way"""
+    for attribute in _SLOTTED:
+        if attribute in cls.__dict__:
+            setattr(cls, f"_default_{attribute}", cls.__dict__[attribute])
+            delattr(cls, attribute)
+
+
+class FSMActor(Actor):
+    """Actor driven by a finite-state machine, its whole state is an integer"""
+
+    # No instance dict: the name, verbosity and machine are set by `__init__`,
+    # from the class defaults unless given
+    __slots__ = ("state", "rng", "_name", "_verbose", "_fsm")
+
+    name = "FSM"
+    verbose = False
+    cloneable = True
+    fsm: FSM
+    state: int
+    rng: BlockRandom | None
+
+    def __init__(
+        self,
+        name: str | None = None,
+        verbose: bool | None = None,
+        fsm: FSM | None = None,
+        seed: SeedLike = None,
+    ):
+        """
+        Initialize the actor
+
+        Args:
+            - name (str | None): The name of the actor, or None to use the default name
+            - verbose (bool | None): Whether to print prompts
+            - fsm (FSM | None): The machine to follow, or None to use the class default
+            - seed (int | SeedSequence | None): Seed of the actor's own random
+            stream, used by stochastic machines only
+        """
+        cls = type(self)
+        self._name = cls.name if name is None else name
+        self._verbose = cls.verbose if verbose is None else verbose
+        self._fsm = cls.fsm if fsm is None else fsm
+        super().__init__()
+        self.state = self._fsm.initial
+        self.seed(seed)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _move_defaults(cls)
+
+    def move(self):
+        return self._fsm.move(self.state, self.rng)
+
+    def result(self, other, delta_score):
+        self.state = self._fsm.next_state(self.state, other)
+
+    def reset(self):
+        self.state = self._fsm.initial
+
+    @property
+    def deterministic(self):
+        return self._fsm.deterministic
+
+    def seed(self, seed=None):
+        self.rng = None if self._fsm.deterministic else BlockRandom(seed)
+
+    def state_key(self):
+        return (self._fsm, self.state) if self._fsm.deterministic else None
+
+    def identity(self):
+        fsm = self._fsm
+        definition = [fsm.transitions.tolist(), fsm.defect_probs.tolist(), fsm.initial]
+        cls = type(self)
+        return f"{cls.__module__}.{cls.__qualname__}:{json.dumps(definition)}"
+
+    def snapshot(self):
+        return self.state
+
+    def restore(self, token):
+        assert isinstance(token, int), "Not a finite-state machine token"
+        self.state = token
+
+    def batch(self, size, rng):
+        return FSMBatch(self, size, rng)
+
+    def clone(self):
+        cloned = copy.copy(self)
+        cloned._verbose = False
+        if self.rng is not None:
+            # Moves of a clone must not consume the draws of the actor it copies
+            cloned.rng = self.rng.spawn()
+        return cloned
+
+
+_move_defaults(FSMActor)
+for _attribute in _SLOTTED:
+    setattr(FSMActor, _attribute, _SlotDefault(_attribute))
+
+
+class FSMBatch(ActorBatch):
+    """Array-state finite-state machine: the state of each copy is an integer"""
+
+    def __init__(self, actor: FSMActor, size, rng):
+        super().__init__(actor, size, rng)
+        self.fsm = actor.fsm
+        self.state = np.full(size, self.fsm.initial, dtype=np.intp)
+
+    def move(self, idx=slice(None)):
+        probs = self.fsm.defect_probs[self.state[idx]]
+        if self.fsm.deterministic:
+            return probs.astype(np.int8)
+        return (self.rng.random(probs.shape) < probs).astype(np.int8)
+
+    def result(self, other, delta_score, idx=slice(None)):
+        self.state[idx] = self.fsm.transitions[self.state[idx], other]
+
+    def reset(self, idx=slice(None)):
+        self.state[idx] = self.fsm.initial
+
+    def actor_at(self, i):
+        actor = self.actor.clone()
+        actor.restore(int(self.state[i]))
+        return actor
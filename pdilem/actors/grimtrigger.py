@@ -1,33 +1,15 @@
 """Grim trigger algorithm"""
 
-from pdilem.actors.abstracts import Actor, Move
+from pdilem.actors.fsm import FSM, FSMActor
 
 
-class GTActor(Actor):
+class GTActor(FSMActor):
     """Grim trigger implementation"""
 
+    __slots__ = ()
+
     name = "GT"
     verbose = False
     cloneable = True
-
-    def __init__(self, name: str | None = None, verbose: bool | None = None):
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-        self.triggered = False
-
-    def move(self):
-        return Move.COOPERATE if not self.triggered else Move.DEFECT
-
-    def result(self, other, delta_score):
-        self.triggered = self.triggered or other == Move.DEFECT
-
-    def reset(self):
-        self.triggered = False
-
-    def clone(self):
-        cloned = super().clone()
-        cloned.triggered = self.triggered
-        return cloned
+    # State 1 (triggered) is entered on the first defection and never left
+    fsm = FSM([[0, 1], [1, 1]], defect_probs=[0.0, 1.0])
@@ -0,0 +1,62 @@
+"""DRL actor running an exported policy without torch"""
+
+from pdilem.actors.drl import PolicyActor
+from pdilem.numpypolicy import NumpyPolicy
+from pdilem.prefixcache import PrefixCache
+
+
+class NumpyDRLActor(PolicyActor):
+    """
+    Plays like `DRLActor` with `NumpyPolicy` weights exported by
+    `pdilem.numpypolicy.export_model`, it cannot be trained
+    """
+
+    name = "NumpyDRL"
+    verbose = False
+    cloneable = False
+
+    def __init__(
+        self,
+        name: str | None = None,
+        verbose: bool | None = None,
+        model: NumpyPolicy | str | None = None,
+        prefix_cache: PrefixCache | None = None,
+    ):
+        """
+        Initialize the actor
+
+        Args:
+            - name (str | None): The name of the actor, or None to use the default name
+            - verbose (bool | None): Whether to print prompts
+            - model (NumpyPolicy | str): The policy to use, or a path to load it from
+            - prefix_cache (PrefixCache | None): Cache of moves by opponent-move
+            prefix, skipping the network on repeated games
+        """
+        if name is not None:
+            self.name = name
+        if verbose is not None:
+            self.verbose = verbose
+        super().__init__()
+
+        assert model is not None, "No model provided for prediction"
+        if isinstance(model, str):
+            self.load_path = model
+            model = NumpyPolicy(model)
+        self.model = model
+        self.prefix_cache = prefix_cache
+        self.reset()
+
+    @property
+    def lstm_hidden_state_shape(self) -> tuple[int, int, int]:
+        """Shape of the LSTM states of one game"""
+        return self.model.lstm_hidden_state_shape
+
+    @property
+    def recurrent(self) -> bool:
+        """Exported policies are always recurrent"""
+        return True
+
+    @property
+    def history_len(self) -> int:
+        """Exported policies observe the opponent's last move"""
+        return 0
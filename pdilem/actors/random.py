@@ -1,19 +1,24 @@
 """Random algorithm"""
 
-import random
+from pdilem.actors.fsm import FSM, FSMActor
+from pdilem.rng import SeedLike
 
-from pdilem.actors.abstracts import Actor, Move
 
-
-class RandActor(Actor):
+class RandActor(FSMActor):
     """Random implementation"""
 
+    __slots__ = ("cprob",)
+
     name = "Rand"
     verbose = False
     cloneable = True
 
     def __init__(
-        self, name: str | None = None, verbose: bool | None = None, cprob: float = 0.5
+        self,
+        name: str | None = None,
+        verbose: bool | None = None,
+        cprob: float = 0.5,
+        seed: SeedLike = None,
     ):
         """
         Initialize the actor
@@ -22,20 +27,7 @@ class RandActor(Actor):
             - name (str | None): The name of the actor, or None to use the default name
             - verbose (bool | None): Whether to print prompts
             - cprob (float | str): Probability of cooperating [0.0, 1.0] (default: 0.5)
+            - seed (int | SeedSequence | None): Seed of the actor's random stream
         """
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-
+        super().__init__(name, verbose, FSM([[0, 0]], defect_probs=[1.0 - cprob]), seed)
         self.cprob = cprob
-
-    def move(self):
-        return Move.COOPERATE if random.random() < self.cprob else Move.DEFECT
-
-    def result(self, other, delta_score):
-        pass
-
-    def reset(self):
-        pass
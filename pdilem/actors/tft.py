@@ -1,71 +1,29 @@
 """Tit-for-tat algorithms"""
 
-import random
+from pdilem.actors.fsm import FSM, FSMActor
 
-from pdilem.actors.abstracts import Actor, Move
+# State 0: the opponent cooperated last round, state 1: the opponent defected
+_TFT_TRANSITIONS = [[0, 1], [0, 1]]
 
 
-class TFTActor(Actor):
+class TFTActor(FSMActor):
     """Tit-for-tat implementation"""
 
+    __slots__ = ()
+
     name = "TFT"
     verbose = False
     cloneable = True
-
-    def __init__(self, name: str | None = None, verbose: bool | None = None):
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-        self.last_opponent_move: Move = Move.COOPERATE
-
-    def move(self):
-        return (
-            Move.COOPERATE if self.last_opponent_move == Move.COOPERATE else Move.DEFECT
-        )
-
-    def result(self, other, delta_score):
-        self.last_opponent_move = other
-
-    def reset(self):
-        self.last_opponent_move = Move.COOPERATE
-
-    def clone(self):
-        cloned = super().clone()
-        cloned.last_opponent_move = self.last_opponent_move
-        return cloned
+    fsm = FSM(_TFT_TRANSITIONS, defect_probs=[0.0, 1.0])
 
 
-class GTFTActor(Actor):
+class GTFTActor(FSMActor):
     """Generous tit-for-tat implementation"""
 
+    __slots__ = ()
+
     name = "GTFT"
     verbose = False
     cloneable = True
-
-    def __init__(self, name: str | None = None, verbose: bool | None = None):
-        if name is not None:
-            self.name = name
-        if verbose is not None:
-            self.verbose = verbose
-        super().__init__()
-        self.last_opponent_move: Move = Move.COOPERATE
-
-    def move(self):
-        if random.randint(0, 9) == 0:
-            return Move.COOPERATE
-        return (
-            Move.COOPERATE if self.last_opponent_move == Move.COOPERATE else Move.DEFECT
-        )
-
-    def result(self, other, delta_score):
-        self.last_opponent_move = other
-
-    def reset(self):
-        self.last_opponent_move = Move.COOPERATE
-
-    def clone(self):
-        cloned = super().clone()
-        cloned.last_opponent_move = self.last_opponent_move
-        return cloned
+    # Forgives a defection one time in ten
+    fsm = FSM(_TFT_TRANSITIONS, defect_probs=[0.0, 0.9])
@@ -0,0 +1,97 @@
+"""Vectorized engine running many Prisoner's Dilemma games at once"""
+
+from typing import Sequence
+
+import numpy as np
+
+from pdilem.actors.abstracts import Actor, ActorBatch
+from pdilem.payoff import PAYOFF
+
+
+class BatchGame:
+    """A batch of Prisoner's Dilemma games advanced together as NumPy arrays"""
+
+    def __init__(
+        self,
+        pairings: Sequence[tuple[Actor, Actor]],
+        matches: int = 1,
+        seed: int | None = None,
+        payoff: np.ndarray = PAYOFF,
+    ) -> None:
+        """
+        Initialize a batch of games
+
+        Args:
+            - pairings (Sequence): Pairs of prototype actors to play against each other,
+            the same prototype may appear in several pairings
+            - matches (int): Number of independent matches played per pairing
+            - seed (int | None): Seed for the randomness of stochastic actors
+            - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+        """
+        self.pairings = list(pairings)
+        self.matches = matches
+        self.size = len(self.pairings) * matches
+        self.payoff = payoff
+        rng = np.random.default_rng(seed)
+        self.sides = [
+            self._group([pairing[side] for pairing in self.pairings], rng)
+            for side in (0, 1)
+        ]
+
+    def _group(
+        self, actors: list[Actor], rng: np.random.Generator
+    ) -> list[tuple[ActorBatch, np.ndarray]]:
+        """Build one actor batch per distinct prototype with the match slots it plays"""
+        prototypes: dict[int, Actor] = {}
+        slots: dict[int, list[int]] = {}
+        for i, actor in enumerate(actors):
+            prototypes[id(actor)] = actor
+            slots.setdefault(id(actor), []).extend(
+                range(i * self.matches, (i + 1) * self.matches)
+            )
+        return [
+            (prototypes[key].batch(len(idx), rng), np.array(idx))
+            for key, idx in slots.items()
+        ]
+
+    def reset(self) -> None:
+        """Reset every actor batch"""
+        for groups in self.sides:
+            for batch, _ in groups:
+                batch.reset()
+
+    def next_round(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Play a round of every game, returns moves and scores per match slot"""
+        move1, move2 = (self._moves(groups) for groups in self.sides)
+        score1 = self.payoff[move1, move2]
+        score2 = self.payoff[move2, move1]
+        for batch, idx in self.sides[0]:
+            batch.result(move2[idx], score1[idx])
+        for batch, idx in self.sides[1]:
+            batch.result(move1[idx], score2[idx])
+        return move1, move2, score1, score2
+
+    def _moves(self, groups: list[tuple[ActorBatch, np.ndarray]]) -> np.ndarray:
+        """Gather the next move of every match slot on one side"""
+        moves = np.empty(self.size, dtype=np.int8)
+        for batch, idx in groups:
+            moves[idx] = batch.move()
+        return moves
+
+    def run(self, rounds: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Run every game for a number of rounds, first resetting the actor batches
+
+        Returns:
+            - tuple: Total scores of the first and second actors, each of shape
+            (len(pairings), matches)
+        """
+        self.reset()
+        total1 = np.zeros(self.size, dtype=np.int64)
+        total2 = np.zeros(self.size, dtype=np.int64)
+        for _ in range(rounds):
+            _, _, score1, score2 = self.next_round()
+            total1 += score1
+            total2 += score2
+        shape = (len(self.pairings), self.matches)
+        return total1.reshape(shape), total2.reshape(shape)
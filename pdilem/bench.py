@@ -0,0 +1,268 @@
+"""Benchmarks of the game, environment, lookahead and DRL hot paths"""
+
+import contextlib
+import io
+import itertools
+import json
+import platform
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from pdilem.actors import (
+    ACActor,
+    ADActor,
+    DRLActor,
+    GTActor,
+    GTFTActor,
+    RandActor,
+    TFTActor,
+)
+from pdilem.actors.abstracts import Actor, Move
+from pdilem.game import Game
+from pdilem.lookahead import Lookahead
+
+LOGIC_ACTORS: list[type[Actor]] = [
+    TFTActor,
+    GTFTActor,
+    ACActor,
+    ADActor,
+    GTActor,
+    RandActor,
+]
+
+# Full lookahead is exponential against stochastic opponents, so environment
+# benchmarks only use deterministic ones
+ENV_OPPONENTS: list[type[Actor]] = [TFTActor, ADActor, ACActor, GTActor]
+
+# Relative change in time per operation beyond which results are flagged
+DEFAULT_TOLERANCE = 0.1
+
+
+def measure(fn: Callable[[], Any], ops: int, repeat: int = 3) -> dict[str, float]:
+    """
+    Time a function, keeping the best of several runs
+
+    Args:
+        - fn (Callable): Function performing `ops` operations per call
+        - ops (int): Number of operations per call
+        - repeat (int): Number of timed calls
+
+    Returns:
+        - dict: Best time of a call, time per operation and operations per second
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": best,
+        "ops": ops,
+        "per_op": best / ops,
+        "per_second": ops / best if best > 0 else float("inf"),
+    }
+
+
+def bench_game(rounds: int, repeat: int) -> dict[str, dict[str, float]]:
+    """`Game.run` and `Game.run_headless` throughput (rounds) for every logic pairing"""
+    results = {}
+    for cls1, cls2 in itertools.combinations_with_replacement(LOGIC_ACTORS, 2):
+        game = Game(cls1(), cls2())
+        pairing = f"{cls1.name}-{cls2.name}"
+
+        def run(game=game):
+            # The final scores are printed unconditionally
+            with contextlib.redirect_stdout(io.StringIO()):
+                game.run(rounds)
+
+        results[f"game.run/{pairing}"] = measure(run, rounds, repeat)
+        results[f"game.run_headless/{pairing}"] = measure(
+            lambda game=game: game.run_headless(rounds), rounds, repeat
+        )
+    return results
+
+
+def bench_env(
+    steps: int, depths: list[int | None], repeat: int
+) -> dict[str, dict[str, float]]:
+    """`PDEnv.step` and `PDEnv.reset` rate for each lookahead depth"""
+    from pdilem.env import PDEnv
+
+    results = {}
+    actions = np.random.default_rng(0).integers(2, size=steps).tolist()
+    for depth in depths:
+        env = PDEnv([cls() for cls in ENV_OPPONENTS], lookahead_depth=depth)
+        env.reset(seed=0)
+
+        def step(env=env):
+            for action in actions:
+                if env.step(action)[2]:
+                    env.reset()
+
+        def reset(env=env):
+            for _ in range(steps // 10):
+                env.reset()
+
+        label = "full" if depth is None else depth
+        results[f"env.step/depth={label}"] = measure(step, steps, repeat)
+        results[f"env.reset/depth={label}"] = measure(reset, steps // 10, repeat)
+    return results
+
+
+def bench_lookahead(depths: list[int], repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Cold optimal score search (as in `PDEnv._optimal_ad_score`) by depth, against
+    a memoizable and a stochastic opponent, and in expected mode
+    """
+    results = {}
+    for cls in (TFTActor, GTFTActor):
+        opponent = cls()
+        for depth in depths:
+            # A new table per call, otherwise only the first call searches
+            results[f"lookahead/{cls.name}/depth={depth}"] = measure(
+                lambda: Lookahead().optimal_score(opponent, depth), 1, repeat
+            )
+    opponent = GTFTActor()
+    for depth in depths:
+        results[f"lookahead/GTFT-expected/depth={depth}"] = measure(
+            lambda: Lookahead(expected=True).optimal_score(opponent, depth), 1, repeat
+        )
+    return results
+
+
+def bench_drl(model_path: str, moves: int, repeat: int) -> dict[str, dict[str, float]]:
+    """`DRLActor.move` latency and `RecurrentPPO.load` time of a saved model"""
+    from sb3_contrib import RecurrentPPO
+
+    results = {
+        "drl.load": measure(lambda: RecurrentPPO.load(model_path), 1, repeat),
+    }
+    actor = DRLActor(model=model_path)
+    others = np.random.default_rng(0).integers(2, size=moves).tolist()
+
+    def play():
+        actor.reset()
+        for other in others:
+            actor.move()
+            actor.result(Move(other), 0)
+
+    results["drl.move"] = measure(play, moves, repeat)
+    return results
+
+
+def run_benchmarks(
+    model_path: str | None = None, quick: bool = False
+) -> dict[str, Any]:
+    """
+    Run the whole suite
+
+    Args:
+        - model_path (str | None): Saved model for the DRL benchmarks, or None
+        to skip them
+        - quick (bool): Run smaller workloads, for a fast sanity check
+
+    Returns:
+        - dict: JSON-serializable environment metadata and results, keyed by
+        benchmark name
+    """
+    repeat = 2 if quick else 5
+    scale = 1 if quick else 10
+    results = {}
+    results.update(bench_game(100 * scale, repeat))
+    results.update(bench_env(200 * scale, [0, 5, None], repeat))
+    results.update(bench_lookahead([1, 2, 4, 8] if quick else [1, 2, 4, 8, 12], repeat))
+    if model_path is not None:
+        results.update(bench_drl(model_path, 20 * scale, repeat))
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "model": model_path,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[tuple[str, float, float, str]]:
+    """
+    Compare the time per operation of results against a baseline
+
+    Args:
+        - results (dict): Output of `run_benchmarks`
+        - baseline (dict): Earlier output of `run_benchmarks`
+        - tolerance (float): Relative change considered noise
+
+    Returns:
+        - list: (name, baseline time per op, time per op, status) of benchmarks in
+        both, status being "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before, after = baseline["results"][name]["per_op"], result["per_op"]
+        if after > before * (1 + tolerance):
+            status = "regression"
+        elif after < before * (1 - tolerance):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, status))
+    return rows
+
+
+def print_results(results: dict[str, Any]) -> None:
+    """Print the time per operation and rate of every benchmark"""
+    width = max(len(name) for name in results["results"]) + 2
+    print(f"\n{'benchmark':<{width}s}{'time/op':>12s}{'ops/s':>14s}")
+    for name, result in results["results"].items():
+        print(
+            f"{name:<{width}s}{_format_time(result['per_op']):>12s}"
+            f"{result['per_second']:>14,.0f}"
+        )
+    print()
+
+
+def print_comparison(rows: list[tuple[str, float, float, str]]) -> None:
+    """Print a comparison made by `compare`"""
+    if not rows:
+        print("No benchmark in common with the baseline\n")
+        return
+    width = max(len(row[0]) for row in rows) + 2
+    print(f"{'benchmark':<{width}s}{'baseline':>12s}{'current':>12s}{'change':>9s}")
+    for name, before, after, status in rows:
+        change = f"{after / before - 1:+.0%}" if before > 0 else "n/a"
+        flag = "" if status == "ok" else f"  {status}"
+        print(
+            f"{name:<{width}s}{_format_time(before):>12s}"
+            f"{_format_time(after):>12s}{change:>9s}{flag}"
+        )
+    print()
+
+
+def save(results: dict[str, Any], path: str) -> None:
+    """Write results as JSON"""
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+def load(path: str) -> dict[str, Any]:
+    """Read results written by `save`"""
+    with open(path) as file:
+        return json.load(file)
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,126 @@
+"""Training callbacks for `DRLActor.train`"""
+
+import csv
+import io
+import os
+from typing import Callable
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from pdilem.checkpoint import CheckpointWriter
+from pdilem.timing import StageTimer, clock
+
+
+class TimingCallback(BaseCallback):
+    """
+    Record where training time goes after every rollout: environment steps per
+    second, wall time of the rollout and of the update preceding it, and the
+    environment's per-stage time during the rollout
+
+    Rows are appended to a CSV file and recorded under `timing/` in the model's
+    logger, so they also reach TensorBoard when `tensorboard_log` is set
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        env_timers: Callable[[], list[StageTimer]],
+        verbose: int = 0,
+    ):
+        """
+        Initialize the callback
+
+        Args:
+            - csv_path (str): CSV file to append rows to
+            - env_timers (Callable): Returns the environments' current timers,
+            whose totals only grow
+            - verbose (int): SB3 verbosity level
+        """
+        super().__init__(verbose)
+        self.csv_path = csv_path
+        self.env_timers = env_timers
+        self._previous = StageTimer()
+        self._rollout_start = 0.0
+        self._rollout_end: float | None = None
+        self._update_time = 0.0
+        self._rollout_steps = 0
+        self._columns: list[str] | None = None
+
+    def _on_training_start(self) -> None:
+        os.makedirs(os.path.dirname(self.csv_path) or ".", exist_ok=True)
+
+    def _on_rollout_start(self) -> None:
+        self._rollout_start = clock()
+        # The update runs between two rollouts
+        if self._rollout_end is not None:
+            self._update_time = self._rollout_start - self._rollout_end
+        self._rollout_steps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        self._rollout_end = clock()
+        rollout_time = self._rollout_end - self._rollout_start
+        steps = self.num_timesteps - self._rollout_steps
+        row = {
+            "timesteps": self.num_timesteps,
+            "steps_per_sec": steps / rollout_time if rollout_time > 0 else 0.0,
+            "rollout_time": rollout_time,
+            "update_time": self._update_time,
+        }
+        current = StageTimer()
+        for timer in self.env_timers():
+            current.merge(timer)
+        for stage, total in sorted(current.totals.items()):
+            row[f"env_{stage}_time"] = total - self._previous.totals.get(stage, 0.0)
+        self._previous = current
+
+        for key, value in row.items():
+            if key != "timesteps":
+                self.logger.record(f"timing/{key}", value)
+        self._write(row)
+
+    def _write(self, row: dict[str, float]) -> None:
+        """Append a row to the CSV file, with a header for a new file"""
+        if self._columns is None:
+            self._columns = list(row)
+            write_header = not os.path.exists(self.csv_path)
+        else:
+            write_header = False
+        with open(self.csv_path, "a", newline="") as file:
+            writer = csv.DictWriter(file, self._columns, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+            writer.writerow(row)
+
+
+class CheckpointCallback(BaseCallback):
+    """
+    Checkpoint the model every `save_freq` timesteps without blocking training
+    for disk I/O: the model, including its optimizer state, is serialized in
+    memory and written by a `CheckpointWriter` thread, which the caller closes
+    once training ends, however it ends
+    """
+
+    def __init__(self, save_freq: int, writer: CheckpointWriter, verbose: int = 0):
+        """
+        Initialize the callback
+
+        Args:
+            - save_freq (int): Number of timesteps between checkpoints
+            - writer (CheckpointWriter): Writer of the serialized checkpoints
+            - verbose (int): SB3 verbosity level
+        """
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.writer = writer
+        self._next = save_freq
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps >= self._next:
+            self._next += self.save_freq
+            buffer = io.BytesIO()
+            self.model.save(buffer)
+            self.writer.submit(self.num_timesteps, buffer.getvalue())
+        return True
@@ -0,0 +1,95 @@
+"""Rotating model checkpoints written to disk in a background thread"""
+
+import glob
+import os
+import queue
+import threading
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def checkpoint_dir(model_path: str) -> str:
+    """Directory of a model's checkpoints, e.g. test_models/checkpoints/name/"""
+    directory, filename = os.path.split(model_path)
+    return os.path.join(directory, CHECKPOINT_DIR, filename.removesuffix(".zip"))
+
+
+def list_checkpoints(directory: str) -> list[str]:
+    """
+    Checkpoint files in a directory, oldest first
+
+    Ordered by modification time, since timesteps restart when training resumes
+    """
+    return sorted(
+        glob.glob(os.path.join(directory, "*_steps.zip")), key=os.path.getmtime
+    )
+
+
+def latest_checkpoint(model_path: str) -> str | None:
+    """
+    Return the model's most recent checkpoint if it is newer than the model
+    file itself (e.g. after a crash), None otherwise
+    """
+    checkpoints = list_checkpoints(checkpoint_dir(model_path))
+    if not checkpoints:
+        return None
+    latest = checkpoints[-1]
+    if os.path.exists(model_path) and os.path.getmtime(model_path) >= os.path.getmtime(
+        latest
+    ):
+        return None
+    return latest
+
+
+class CheckpointWriter:
+    """
+    Background thread writing serialized checkpoints to a directory, keeping
+    only the most recent ones
+
+    Writes are atomic, a checkpoint is renamed into place once fully written
+    """
+
+    def __init__(self, directory: str, prefix: str, keep: int = 3):
+        """
+        Start the writer thread
+
+        Args:
+            - directory (str): Directory to write checkpoints to
+            - prefix (str): File name prefix, followed by `_<timesteps>_steps.zip`
+            - keep (int): Number of most recent checkpoints to keep, at least 1
+        """
+        if keep < 1:
+            raise ValueError("At least one checkpoint must be kept")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.keep = keep
+        self.error: Exception | None = None
+        self._queue: queue.Queue[tuple[int, bytes] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, timesteps: int, data: bytes) -> None:
+        """Queue a serialized checkpoint for writing, returns immediately"""
+        self._queue.put((timesteps, data))
+
+    def close(self) -> None:
+        """Wait for queued checkpoints to be written and stop the thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            try:
+                self._write(*item)
+            except OSError as e:
+                # Training goes on, the next checkpoint may succeed
+                self.error = e
+
+    def _write(self, timesteps: int, data: bytes) -> None:
+        path = os.path.join(self.directory, f"{self.prefix}_{timesteps}_steps.zip")
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(path + ".tmp", path)
+        for old in list_checkpoints(self.directory)[: -self.keep]:
+            os.remove(old)
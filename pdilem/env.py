@@ -1,6 +1,5 @@
 """Define the environment for the Prisoner's Dilemma game"""
 
-import random
 from typing import Any
 
 import gymnasium as gym
@@ -8,6 +7,11 @@ import numpy as np
 from gymnasium import spaces
 
 from pdilem.actors.abstracts import Actor, Move
+from pdilem.history import MoveHistory, history_space
+from pdilem.lookahead import Lookahead
+from pdilem.payoff import PAYOFF
+from pdilem.store import HistoryWriter
+from pdilem.timing import StageTimer, clock
 
 
 class PDEnv(gym.Env):
@@ -18,6 +22,12 @@ class PDEnv(gym.Env):
         opponents: list[Actor] | Actor,
         episode_len: int = 50,
         lookahead_depth: int | None = 0,
+        payoff: np.ndarray = PAYOFF,
+        expected_lookahead: bool = False,
+        history_len: int = 0,
+        history_writer: HistoryWriter | None = None,
+        history_metadata: dict[str, Any] | None = None,
+        timer: StageTimer | None = None,
     ):
         """
         Initialize the environment
@@ -27,12 +37,29 @@ class PDEnv(gym.Env):
             - episode_len (int): Number of steps per episode
             - lookahead_depth (int | None): Number of steps to look ahead,
             or None for full lookahead, or 0 for no lookahead
+            - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+            - expected_lookahead (bool): Whether the lookahead finds the expected
+            optimal score against stochastic opponents rather than sampling their
+            moves once (see `Lookahead`)
+            - history_len (int): Number of past rounds of both players observed
+            as bit vectors (see `pdilem.history`), or 0 to only observe the
+            opponent's last move
+            - history_writer (HistoryWriter | None): Store to append the moves of
+            every finished episode to, or None to not record them
+            - history_metadata (dict | None): JSON-serializable details recorded
+            with every episode, e.g. the agent's name and model path
+            - timer (StageTimer | None): Timer accumulating the wall time of each
+            stage of `step` and `reset`, or None to not time them
         """
         super(PDEnv, self).__init__()
         # 2 options - {0: cooperate, 1: defect}
         self.action_space = spaces.Discrete(2)
         # 3 options - {0: cooperate, 1: defect, 2: start (no move yet)}
         self.observation_space = spaces.Discrete(3)
+        self._history: MoveHistory | None = None
+        if history_len > 0:
+            self.observation_space = history_space(history_len)
+            self._history = MoveHistory(history_len)
         self._step_num = 0
         self._total_steps = episode_len
         self._total_score = 0
@@ -41,19 +68,37 @@ class PDEnv(gym.Env):
         self._opponent_actors = (
             opponents if isinstance(opponents, list) else [opponents]
         )
-        self._opponent_actor = random.choice(self._opponent_actors)
+        self._opponent_actor = self._choose_opponent()
         self._lookahead_depth = lookahead_depth
+        self._payoff = payoff
+        self._lookahead = Lookahead(payoff, expected=expected_lookahead)
+        self._history_writer = history_writer
+        self._history_metadata = history_metadata or {}
+        self._episode_moves: list[tuple[int, int]] = []
+        # Seed of the last seeded reset, and the number of the episode since
+        self._seed: int | None = None
+        self._episode = -1
+        self.timer = timer
+
+    def _choose_opponent(self) -> Actor:
+        """Sample an opponent with the environment's seeded generator"""
+        return self._opponent_actors[
+            self.np_random.integers(len(self._opponent_actors))
+        ]
 
     def _get_obs(self):
         """
         Return the current observation
 
         Returns:
-            - int: The current observation, one of:
+            - np.ndarray: The window of past rounds with a history, otherwise
+            the opponent's last move, one of:
                 - 0: cooperate
                 - 1: defect
                 - 2: start (no move yet)
         """
+        if self._history is not None:
+            return self._history.observation(0)[0]
         return np.array(
             [[self._opponent_move.to_int() if self._opponent_move is not None else 2]]
         )
@@ -65,75 +110,35 @@ class PDEnv(gym.Env):
         Returns:
             - dict: The current info:
                 - delta (int): The increase in score from the last step
-                - optimal_ad (int): The optimal achievable additional score
+                - optimal_ad (float): The optimal achievable additional score
         """
         return {
             "delta": (
-                self._chosen_move.score(self._opponent_move)
+                int(self._payoff[self._chosen_move, self._opponent_move])
                 if self._opponent_move is not None
                 else 0
             ),
             "optimal_ad": self._optimal_ad_score() or 0,
         }
 
-    def _calc_reward(self) -> int:
-        """Calculate the reward for the current step"""
-        info = self._get_info()
+    def _calc_reward(self, info: dict[str, float]) -> float:
+        """Calculate the reward for the current step from its info"""
         return info["delta"] + info["optimal_ad"]
 
-    def _optimal_ad_score(
-        self,
-        _cur_iter: int | None = None,
-        _cur_opponent: Actor | None = None,
-    ) -> int | None:
+    def _optimal_ad_score(self) -> float | None:
         """
         Find the optimal achievable additional score at the current state
-        (computationally expensive lookahead)
-
-        Arguments are used for recursive calls, do not set them
+        (memoized lookahead, see `Lookahead`)
 
         Returns:
-            - int | None: The best achievable score if the opponent is
+            - float | None: The best achievable score if the opponent is
             cloneable and lookahead should be performed, None otherwise
         """
         if not self._opponent_actor.cloneable or self._lookahead_depth == 0:
             return None
 
-        if _cur_iter is None:
-            _cur_iter = 0
-
-        if _cur_opponent is None:
-            _cur_opponent = self._opponent_actor
-
-        iter_obj = self._lookahead_depth or self._total_steps
-
-        if _cur_iter >= iter_obj:
-            return 0
-
-        clone_a = _cur_opponent.clone()
-        clone_b = _cur_opponent.clone()
-
-        self_move_a = Move.COOPERATE
-        self_move_b = Move.DEFECT
-        clone_move_a = clone_a.move()
-        clone_move_b = clone_b.move()
-
-        self_score_a = self_move_a.score(clone_move_a)
-        self_score_b = self_move_b.score(clone_move_b)
-        clone_score_a = clone_move_a.score(self_move_a)
-        clone_score_b = clone_move_b.score(self_move_b)
-
-        clone_a.result(self_move_a, clone_score_a)
-        clone_b.result(self_move_b, clone_score_b)
-
-        total_score_a = self_score_a + (
-            self._optimal_ad_score(_cur_iter + 1, clone_a) or 0
-        )
-        total_score_b = self_score_b + (
-            self._optimal_ad_score(_cur_iter + 1, clone_b) or 0
-        )
-
-        return max(total_score_a, total_score_b)
+        remaining = self._lookahead_depth or self._total_steps
+        return self._lookahead.optimal_score(self._opponent_actor, remaining)
 
     def reset(
         self,
@@ -155,7 +160,16 @@ class PDEnv(gym.Env):
         Returns:
             - np.ndarray: The initial observation
         """
+        start = clock() if self.timer is not None else 0.0
         super().reset(*args, seed=seed, options=options)
+        self._episode += 1
+        if seed is not None:
+            self._seed = seed
+            self._episode = 0
+            # Independent, reproducible streams for every opponent (and worker)
+            streams = np.random.SeedSequence(seed).spawn(len(self._opponent_actors))
+            for actor, stream in zip(self._opponent_actors, streams):
+                actor.seed(stream)
 
         self._step_num = 0
         self._total_steps = train_iterations or self._total_steps
@@ -163,14 +177,19 @@ class PDEnv(gym.Env):
 
         self._chosen_move = Move.COOPERATE
         self._opponent_move = None
+        self._episode_moves.clear()
+        if self._history is not None:
+            self._history.clear()
 
         if self._opponent_actors and self._opponent_actor:
             self._opponent_actor.reset()
-            self._opponent_actor = random.choice(self._opponent_actors)
+            self._opponent_actor = self._choose_opponent()
 
         observation = self._get_obs()
         info = self._get_info()
 
+        if self.timer is not None:
+            self.timer.add("reset", clock() - start)
         return observation, info
 
     def step(self, action: int):
@@ -188,24 +207,53 @@ class PDEnv(gym.Env):
                 - truncated (bool): (always False for this environment)
                 - info (dict): The step info
         """
+        timer = self.timer
+        start = clock() if timer is not None else 0.0
         self._step_num += 1
         self._chosen_move = Move.from_int(action)
 
         self._opponent_move = self._opponent_actor.move()
-        self._opponent_actor.total_score += self._opponent_move.score(self._chosen_move)
-        self._opponent_actor.result(
-            self._chosen_move, self._opponent_move.score(self._chosen_move)
-        )
+        opponent_score = int(self._payoff[self._opponent_move, self._chosen_move])
+        self._opponent_actor.total_score += opponent_score
+        self._opponent_actor.result(self._chosen_move, opponent_score)
 
+        opponent_end = clock() if timer is not None else 0.0
+        if timer is not None:
+            timer.add("opponent", opponent_end - start)
         info = self._get_info()
+        reward_end = clock() if timer is not None else 0.0
+        if timer is not None:
+            timer.add("reward", reward_end - opponent_end)
+        if self._history is not None:
+            self._history.push(self._chosen_move, self._opponent_move, 0)
         observation = self._get_obs()
 
         self._total_score += info["delta"]  # set before reward calculation
 
-        reward = self._calc_reward()
+        reward = self._calc_reward(info)
         terminated = self._step_num >= self._total_steps
 
+        if self._history_writer is not None:
+            self._record(terminated)
+
+        if timer is not None:
+            timer.add("observation", clock() - reward_end)
         return observation, reward, terminated, False, info
 
+    def _record(self, terminated: bool) -> None:
+        """Record the step's moves, appending the episode to the store when it ends"""
+        assert self._history_writer is not None and self._opponent_move is not None
+        self._episode_moves.append((self._chosen_move, self._opponent_move))
+        if terminated:
+            self._history_writer.append(
+                np.array(self._episode_moves, dtype=np.int8),
+                **self._history_metadata,
+                opponent=self._opponent_actor.name,
+                lookahead_depth=self._lookahead_depth,
+                payoff=self._payoff.ravel().tolist(),
+                seed=self._seed,
+                episode=self._episode,
+            )
+
     def render(self):
         """Not supported"""
@@ -0,0 +1,159 @@
+"""Evaluation of an actor against opponents with sequential stopping"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Sequence
+
+import numpy as np
+
+from pdilem.batchgame import BatchGame
+from pdilem.payoff import PAYOFF
+from pdilem.tournament import ActorFactory
+
+
+class PairingEstimate:
+    """Mean match score of an actor against one opponent, with its confidence interval"""
+
+    def __init__(self, opponent: str, scores: np.ndarray, half_width: float):
+        """
+        Initialize the estimate
+
+        Args:
+            - opponent (str): Name of the opponent
+            - scores (np.ndarray): Total score of the evaluated actor in every match
+            - half_width (float): Half width of the confidence interval of the mean
+        """
+        self.opponent = opponent
+        self.scores = scores
+        self.half_width = half_width
+
+    @property
+    def matches(self) -> int:
+        """Number of matches played"""
+        return len(self.scores)
+
+    @property
+    def mean(self) -> float:
+        """Mean score per match"""
+        return float(self.scores.mean())
+
+    @property
+    def interval(self) -> tuple[float, float]:
+        """Confidence interval of the mean score per match"""
+        return self.mean - self.half_width, self.mean + self.half_width
+
+
+def evaluate_pairing(
+    factory: ActorFactory,
+    opponent_factory: ActorFactory,
+    rounds: int,
+    width: float,
+    confidence: float = 0.95,
+    batch: int = 16,
+    max_matches: int = 1024,
+    seed: int | None = None,
+    payoff: np.ndarray = PAYOFF,
+) -> tuple[np.ndarray, float]:
+    """
+    Play matches in batches until the confidence interval of the mean score is
+    narrower than `width`, or `max_matches` were played
+
+    A pairing of two deterministic actors always plays the same match, so it is
+    played once with an interval of zero width. Otherwise at least two matches
+    are needed to estimate the interval
+
+    Returns:
+        - tuple: The evaluated actor's score in every match, and the half width of
+        the confidence interval (normal approximation)
+    """
+    actor, opponent = factory(), opponent_factory()
+    if actor.deterministic and opponent.deterministic:
+        game = BatchGame([(actor, opponent)], 1, seed=seed, payoff=payoff)
+        return game.run(rounds)[0].ravel(), 0.0
+
+    if max_matches < 2:
+        raise ValueError("At least two matches are needed for a confidence interval")
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    # Batch seeds come from one generator, so batches play different matches
+    rng = np.random.default_rng(seed)
+    scores = np.zeros(0, dtype=np.int64)
+    half_width = math.inf
+    while len(scores) < max_matches:
+        size = min(max(batch, 2 - len(scores)), max_matches - len(scores))
+        batch_seed = int(rng.integers(2**32))
+        game = BatchGame([(actor, opponent)], size, seed=batch_seed, payoff=payoff)
+        scores = np.concatenate([scores, game.run(rounds)[0].ravel()])
+        half_width = z * float(scores.std(ddof=1)) / math.sqrt(len(scores))
+        if 2 * half_width <= width:
+            break
+    return scores, half_width
+
+
+def evaluate(
+    factory: ActorFactory,
+    opponent_names: Sequence[str],
+    opponent_factories: Sequence[ActorFactory],
+    rounds: int,
+    width: float,
+    confidence: float = 0.95,
+    max_matches: int = 1024,
+    workers: int | None = None,
+    seed: int | None = None,
+    payoff: np.ndarray = PAYOFF,
+) -> list[PairingEstimate]:
+    """
+    Evaluate an actor against every opponent in parallel, each pairing playing
+    only as many matches as its confidence interval needs
+
+    Args:
+        - factory (ActorFactory): Picklable callable building the evaluated actor
+        - opponent_names (Sequence): Opponent names
+        - opponent_factories (Sequence): Picklable callables building each opponent
+        - rounds (int): Number of rounds per match
+        - width (float): Target width of the confidence interval of the mean
+        score per match
+        - confidence (float): Confidence level of the interval
+        - max_matches (int): Maximum number of matches per opponent
+        - workers (int | None): Number of worker processes, or None for one per core
+        - seed (int | None): Seed from which each pairing's seed is derived
+        - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+
+    Returns:
+        - list: One estimate per opponent, in order
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(len(opponent_factories))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                evaluate_pairing,
+                factory,
+                opponent_factory,
+                rounds,
+                width,
+                confidence,
+                max_matches=max_matches,
+                seed=int(pair_seed),
+                payoff=payoff,
+            )
+            for opponent_factory, pair_seed in zip(opponent_factories, seeds)
+        ]
+        return [
+            PairingEstimate(name, *future.result())
+            for name, future in zip(opponent_names, futures)
+        ]
+
+
+def print_evaluation(name: str, estimates: list[PairingEstimate]) -> None:
+    """Print the mean score and confidence interval against every opponent"""
+    width = max(10, *(len(estimate.opponent) + 2 for estimate in estimates))
+    print(f"\nEvaluation of {name} (mean score per match):")
+    print(f"{'opponent':<{width}s}{'matches':>9s}{'mean':>10s}{'interval':>22s}")
+    for estimate in estimates:
+        low, high = estimate.interval
+        print(
+            f"{estimate.opponent:<{width}s}{estimate.matches:>9d}"
+            f"{estimate.mean:>10.2f}{f'[{low:.2f}, {high:.2f}]':>22s}"
+        )
+    print()
@@ -0,0 +1,195 @@
+"""Evolutionary population dynamics over a pairwise payoff matrix"""
+
+import numpy as np
+
+
+def replicator_dynamics(
+    payoff: np.ndarray,
+    shares: np.ndarray,
+    generations: int,
+    record_every: int = 1,
+) -> np.ndarray:
+    """
+    Run discrete-time replicator dynamics, where each strategy's share grows in
+    proportion to its fitness relative to the population mean
+
+    Args:
+        - payoff (np.ndarray): (n, n) mean score of the row strategy against the
+        column strategy, e.g. `TournamentResult.scores`
+        - shares (np.ndarray): (n,) initial population shares, or (k, n) for k
+        populations evolved together
+        - generations (int): Number of generations to run
+        - record_every (int): Record the shares every this many generations
+
+    Returns:
+        - np.ndarray: Recorded shares, of shape (records, *shares.shape), starting
+        with the initial shares
+    """
+    # Fitness must be positive for shares to stay valid proportions
+    fitness_table = payoff - min(payoff.min(), 0) + 1e-12
+    x = np.asarray(shares, dtype=np.float64)
+    x = x / x.sum(axis=-1, keepdims=True)
+    records = [x]
+    for generation in range(1, generations + 1):
+        fitness = x @ fitness_table.T
+        x = x * fitness
+        x /= x.sum(axis=-1, keepdims=True)
+        if generation % record_every == 0:
+            records.append(x)
+    return np.stack(records)
+
+
+def moran_process(
+    payoff: np.ndarray,
+    counts: np.ndarray,
+    generations: int,
+    selection: float = 1.0,
+    record_every: int = 1,
+    seed: int | None = None,
+) -> np.ndarray:
+    """
+    Run Moran processes on finite populations: at each step one individual,
+    chosen proportionally to fitness, reproduces and one individual of the
+    population before the birth, chosen uniformly (possibly the parent), is
+    replaced by the offspring
+
+    A step is a single birth-death event, so a population of N takes N steps per
+    generation. Use `wright_fisher_process` for long runs on large populations
+
+    Independent populations are simulated together as rows of a count array
+
+    Args:
+        - payoff (np.ndarray): (n, n) mean score of the row strategy against the
+        column strategy, e.g. `TournamentResult.scores`
+        - counts (np.ndarray): (n,) initial number of individuals of each strategy,
+        or (k, n) for k independent populations
+        - generations (int): Number of birth-death events to run
+        - selection (float): Intensity of selection in [0, 1], fitness is
+        `1 - selection + selection * mean payoff`
+        - record_every (int): Record the counts every this many events
+        - seed (int | None): Seed of the random generator
+
+    Returns:
+        - np.ndarray: Recorded counts, of shape (records, *counts.shape), starting
+        with the initial counts
+    """
+    rng = np.random.default_rng(seed)
+    squeeze = np.ndim(counts) == 1
+    # Counts are kept as floats for fast matrix products
+    counts = np.array(counts, dtype=np.float64, ndmin=2)
+    scale, offset = _fitness_terms(payoff, counts, selection)
+    rows = np.arange(len(counts))
+    records = [counts.copy()]
+    draws = np.empty((0, len(counts), 2))
+    for generation in range(1, generations + 1):
+        if not len(draws):
+            draws = rng.random(
+                (min(generations - generation + 1, 1024), len(counts), 2)
+            )
+        birth_draw, death_draw = draws[0, :, 0], draws[0, :, 1]
+        draws = draws[1:]
+        fitness = _fitness(payoff, counts, scale, offset) * counts
+        parent = _sample(fitness, birth_draw)
+        dead = _sample(counts, death_draw)
+        counts[rows, parent] += 1
+        counts[rows, dead] -= 1
+        if generation % record_every == 0:
+            records.append(counts.copy())
+    recorded = np.stack(records).astype(np.int64)
+    return recorded[:, 0] if squeeze else recorded
+
+
+def wright_fisher_process(
+    payoff: np.ndarray,
+    counts: np.ndarray,
+    generations: int,
+    selection: float = 1.0,
+    record_every: int = 1,
+    seed: int | None = None,
+) -> np.ndarray:
+    """
+    Run Wright-Fisher processes on finite populations: at each generation the
+    whole population is replaced by N offspring, whose parents are drawn
+    proportionally to fitness (one multinomial draw per population)
+
+    Fitness is as in `moran_process`. A generation costs one vectorized step
+    whatever the population size, so long runs on large populations are cheap
+
+    Args:
+        - payoff (np.ndarray): (n, n) mean score of the row strategy against the
+        column strategy, e.g. `TournamentResult.scores`
+        - counts (np.ndarray): (n,) initial number of individuals of each strategy,
+        or (k, n) for k independent populations
+        - generations (int): Number of generations to run
+        - selection (float): Intensity of selection in [0, 1], fitness is
+        `1 - selection + selection * mean payoff`
+        - record_every (int): Record the counts every this many generations
+        - seed (int | None): Seed of the random generator
+
+    Returns:
+        - np.ndarray: Recorded counts, of shape (records, *counts.shape), starting
+        with the initial counts
+    """
+    rng = np.random.default_rng(seed)
+    squeeze = np.ndim(counts) == 1
+    counts = np.array(counts, dtype=np.int64, ndmin=2)
+    size = counts.sum(axis=1)
+    scale, offset = _fitness_terms(payoff, counts, selection)
+    records = [counts.copy()]
+    for generation in range(1, generations + 1):
+        if np.count_nonzero(counts) == len(counts):
+            # Every population is down to one strategy, which it keeps
+            records.extend(
+                counts.copy()
+                for _ in range(generations // record_every - len(records) + 1)
+            )
+            break
+        weights = np.maximum(scale * (counts @ payoff.T) + offset, 0) * counts
+        totals = weights.sum(axis=1)
+        # Small arrays, a multinomial draw per population is faster than one
+        # broadcast draw
+        for row, total in enumerate(totals):
+            if total > 0:
+                counts[row] = rng.multinomial(size[row], weights[row] / total)
+            else:
+                # Neutral drift if no individual has positive fitness
+                counts[row] = rng.multinomial(size[row], counts[row] / size[row])
+        if generation % record_every == 0:
+            records.append(counts.copy())
+    recorded = np.stack(records)
+    return recorded[:, 0] if squeeze else recorded
+
+
+def _fitness_terms(
+    payoff: np.ndarray, counts: np.ndarray, selection: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fitness is affine in the counts, fold its constants (mean payoff against the
+    rest of the population, no self-interaction) into a scale and an offset
+    """
+    size = counts.sum(axis=1, keepdims=True)
+    scale = selection / np.maximum(size - 1, 1)
+    offset = 1 - selection - scale * np.diag(payoff)
+    return scale, offset
+
+
+def _fitness(
+    payoff: np.ndarray, counts: np.ndarray, scale: np.ndarray, offset: np.ndarray
+) -> np.ndarray:
+    """
+    Non-negative fitness of every strategy, neutral if no individual has a
+    positive one
+    """
+    fitness = np.maximum(scale * (counts @ payoff.T) + offset, 0)
+    stuck = (fitness * counts).sum(axis=1) <= 0
+    fitness[stuck] = 1
+    return fitness
+
+
+def _sample(weights: np.ndarray, draws: np.ndarray) -> np.ndarray:
+    """
+    Sample one column index per row with probability proportional to the weights,
+    from uniform draws in [0, 1)
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    return (cumulative <= (draws * cumulative[:, -1])[:, np.newaxis]).sum(axis=1)
@@ -1,15 +1,36 @@
 """Classes for Prisoner's Dilemma"""
 
+from typing import NamedTuple
+
+import numpy as np
+
 from pdilem.actors.abstracts import Actor, Move
+from pdilem.payoff import PAYOFF
+
+
+class GameHistory(NamedTuple):
+    """Per-round record of a game, column 0 for the first actor, 1 for the second"""
+
+    moves: np.ndarray  # (rounds, 2) int8 `Move` values
+    scores: np.ndarray  # (rounds, 2) int16 scores
+
+    @property
+    def totals(self) -> tuple[int, int]:
+        """Total scores of the first and second actors"""
+        total1, total2 = self.scores.sum(axis=0, dtype=np.int64)
+        return int(total1), int(total2)
 
 
 class Game:
     """A Prisoner's Dilemma game"""
 
-    def __init__(self, actor1: Actor, actor2: Actor) -> None:
-        """Initialize a new game"""
+    def __init__(
+        self, actor1: Actor, actor2: Actor, payoff: np.ndarray = PAYOFF
+    ) -> None:
+        """Initialize a new game with a 2x2 payoff table (see `pdilem.payoff`)"""
         self.actor1 = actor1
         self.actor2 = actor2
+        self.payoff = payoff
         if actor1.name == actor2.name:
             actor1.name = f"{actor1.name}1"
             actor2.name = f"{actor2.name}2"
@@ -28,8 +49,8 @@ class Game:
         move1 = self.actor1.move()
         self.actor2.print_label("INPUT")
         move2 = self.actor2.move()
-        score1 = move1.score(move2)
-        score2 = move2.score(move1)
+        score1 = int(self.payoff[move1, move2])
+        score2 = int(self.payoff[move2, move1])
         self.actor1.total_score += score1
         self.actor2.total_score += score2
         self.actor1.result(move2, score1)
@@ -50,6 +71,30 @@ class Game:
         self.print_status("Scores", key="total_score", unconditional=True)
         return self.actor1.total_score, self.actor2.total_score
 
+    def run_headless(self, rounds: int) -> GameHistory:
+        """
+        Run the game without printing anything, first resetting the game and actors
+
+        Returns:
+            - GameHistory: The moves and scores of every round
+        """
+        self.reset()
+        actor1, actor2 = self.actor1, self.actor2
+        payoff = self.payoff.tolist()
+        history = []
+        for _ in range(rounds):
+            move1 = actor1.move()
+            move2 = actor2.move()
+            score1 = payoff[move1][move2]
+            score2 = payoff[move2][move1]
+            actor1.result(move2, score1)
+            actor2.result(move1, score2)
+            history.append((move1, move2, score1, score2))
+        record = np.array(history, dtype=np.int16).reshape(rounds, 4)
+        result = GameHistory(record[:, :2].astype(np.int8), record[:, 2:].copy())
+        actor1.total_score, actor2.total_score = result.totals
+        return result
+
     def print_status(
         self,
         label: str,
@@ -0,0 +1,94 @@
+"""Fixed-size windows of both players' last moves, observed as bit vectors"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from gymnasium import spaces
+
+# Bits per round, oldest round first: whether the round was played, whether
+# the agent defected and whether the opponent defected
+ROUND_BITS = 3
+
+
+def history_space(length: int) -> "spaces.MultiBinary":
+    """Observation space of a window of `length` rounds"""
+    from gymnasium import spaces
+
+    return spaces.MultiBinary(ROUND_BITS * length)
+
+
+def history_length(space: "spaces.Space") -> int:
+    """
+    Window length of an observation space, 0 for the `Discrete(3)` space of the
+    opponent's last move
+    """
+    return space.shape[0] // ROUND_BITS if space.shape else 0
+
+
+class MoveHistory:
+    """
+    Last `length` rounds of `size` games, kept in ring buffers
+
+    Each round is written twice, `length` rows apart, so the window of a game is
+    always a contiguous slice of its buffer: no allocation or roll per round
+    """
+
+    def __init__(self, length: int, size: int = 1):
+        """
+        Initialize empty windows
+
+        Args:
+            - length (int): Number of rounds in a window
+            - size (int): Number of games
+        """
+        self.length = length
+        self.size = size
+        self._buffer = np.zeros((size, 2 * length, ROUND_BITS), dtype=np.int8)
+        # Row of every game's next round, its window starts there
+        self._pos = np.zeros(size, dtype=np.intp)
+        self._games = np.arange(size)
+
+    def push(
+        self,
+        own: int | np.ndarray,
+        other: int | np.ndarray,
+        idx: slice | np.ndarray | int = slice(None),
+    ) -> None:
+        """
+        Record a round of the selected games
+
+        Args:
+            - own (int | np.ndarray): The agent's moves
+            - other (int | np.ndarray): The opponent's moves
+            - idx (slice | np.ndarray | int): Selected games
+        """
+        games = self._games[idx]
+        pos = self._pos[games]
+        for row in (pos, pos + self.length):
+            self._buffer[games, row, 0] = 1
+            self._buffer[games, row, 1] = own
+            self._buffer[games, row, 2] = other
+        self._pos[games] = (pos + 1) % self.length
+
+    def clear(self, idx: slice | np.ndarray | int = slice(None)) -> None:
+        """Empty the windows of the selected games"""
+        self._buffer[idx] = 0
+        self._pos[idx] = 0
+
+    def observation(self, idx: slice | np.ndarray | int = slice(None)) -> np.ndarray:
+        """Return the (n, ROUND_BITS * length) windows of the selected games"""
+        games = self._games[idx]
+        if np.ndim(games) == 0:
+            pos = self._pos[games]
+            return self._buffer[games, pos : pos + self.length].reshape(1, -1).copy()
+        rows = self._pos[games, np.newaxis] + np.arange(self.length)
+        return self._buffer[games[:, np.newaxis], rows].reshape(len(games), -1)
+
+    def take(self, i: int) -> "MoveHistory":
+        """Return a single-game copy of game `i`"""
+        history = MoveHistory(self.length)
+        history._buffer[0] = self._buffer[i]
+        history._pos[0] = self._pos[i]
+        return history
@@ -0,0 +1,132 @@
+"""Memoized lookahead for the optimal achievable score against an opponent"""
+
+from typing import Hashable
+
+import numpy as np
+
+from pdilem.actors.abstracts import Actor, Move
+from pdilem.actors.fsm import FSM, FSMActor
+from pdilem.payoff import PAYOFF
+
+
+class Lookahead:
+    """
+    Dynamic-programming search for the best achievable score against a
+    cloneable opponent over a number of remaining rounds
+
+    Results are memoized on (opponent state key, remaining rounds), so the
+    table is shared between search nodes, environment steps and episodes. The
+    search plays every branch on a single copy of the opponent, restoring it
+    from a state token (see `Actor.snapshot`) instead of cloning it per node.
+    The copy has its own random stream, so the opponent's draws are left for
+    its real moves
+
+    By default a stochastic opponent's moves are sampled once per search node,
+    so the score is a one-sample estimate. In expected mode the optimal expected
+    score is computed instead, exactly. Expected mode covers finite-state-machine
+    opponents only, other stochastic opponents raise `ValueError` (there is no
+    sampled estimator)
+    """
+
+    def __init__(self, payoff: np.ndarray = PAYOFF, expected: bool = False) -> None:
+        """
+        Initialize an empty lookahead table
+
+        Args:
+            - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+            - expected (bool): Whether to find the expected optimal score
+            against stochastic opponents
+        """
+        self._payoff = payoff
+        self.expected = expected
+        self._table: dict[tuple[Hashable, int], int] = {}
+        self._fsm_values: dict[FSM, list[np.ndarray]] = {}
+
+    def clear(self) -> None:
+        """Forget all memoized results"""
+        self._table.clear()
+        self._fsm_values.clear()
+
+    def optimal_score(self, opponent: Actor, remaining: int) -> float:
+        """
+        Find the optimal achievable score against the opponent
+
+        Args:
+            - opponent (Actor): A cloneable opponent, left unmodified
+            - remaining (int): Number of rounds to look ahead
+
+        Returns:
+            - float: The best achievable score over the remaining rounds (an
+            integer unless in expected mode against a stochastic opponent)
+        """
+        if remaining <= 0:
+            return 0
+
+        if self.expected and not opponent.deterministic:
+            if not isinstance(opponent, FSMActor):
+                # Averaging sampled searches would estimate the expected maximum
+                # instead, which overrates the agent
+                raise ValueError(
+                    f"Expected lookahead needs a finite-state-machine opponent: "
+                    f"{opponent.name}"
+                )
+            return float(self.fsm_values(opponent.fsm, remaining)[opponent.state])
+        return self._search(opponent.clone(), remaining)
+
+    def fsm_values(self, fsm: FSM, remaining: int) -> np.ndarray:
+        """
+        Expected optimal score against a finite-state machine from every state
+
+        The opponent's next state depends only on our move, so the expectation
+        over its random moves is taken round by round, for all states at once
+
+        Returns:
+            - np.ndarray: (n_states,) expected optimal scores over `remaining` rounds
+        """
+        values = self._fsm_values.setdefault(fsm, [np.zeros(fsm.n_states)])
+        if len(values) <= remaining:
+            # Expected score of each of our moves against each state
+            defect = fsm.defect_probs[:, np.newaxis]
+            expected_score = (1 - defect) * self._payoff[:, Move.COOPERATE] + (
+                defect * self._payoff[:, Move.DEFECT]
+            )
+            for _ in range(len(values), remaining + 1):
+                values.append(
+                    (expected_score + values[-1][fsm.transitions]).max(axis=1)
+                )
+        return values[remaining]
+
+    def _search(self, opponent: Actor, remaining: int) -> int:
+        """
+        Memoized search with one sample of the opponent's moves per node, the
+        opponent is back in its initial state on return
+        """
+        if remaining <= 0:
+            return 0
+
+        key = opponent.state_key()
+        if key is not None:
+            cached = self._table.get((key, remaining))
+            if cached is not None:
+                return cached
+
+        token = opponent.snapshot()
+        best = max(
+            self._branch_score(opponent, token, self_move, remaining)
+            for self_move in (Move.COOPERATE, Move.DEFECT)
+        )
+        opponent.restore(token)
+
+        if key is not None:
+            self._table[(key, remaining)] = best
+        return best
+
+    def _branch_score(
+        self, opponent: Actor, token: Hashable, self_move: Move, remaining: int
+    ) -> int:
+        """Score of playing `self_move` from the `token` state and optimally afterwards"""
+        opponent.restore(token)
+        opponent_move = opponent.move()
+        opponent.result(self_move, int(self._payoff[opponent_move, self_move]))
+        score = int(self._payoff[self_move, opponent_move])
+        return score + self._search(opponent, remaining - 1)
@@ -0,0 +1,113 @@
+"""Process-wide cache of trained models loaded from disk"""
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sb3_contrib import RecurrentPPO
+    from stable_baselines3 import PPO
+
+
+def model_class(path: str) -> "type[RecurrentPPO] | type[PPO]":
+    """
+    Return the algorithm a model file was saved by, `RecurrentPPO` or the
+    feed-forward `PPO`, without loading its weights
+    """
+    from sb3_contrib import RecurrentPPO
+    from stable_baselines3 import PPO
+
+    if not os.path.exists(path) and os.path.exists(path + ".zip"):
+        path += ".zip"
+    with zipfile.ZipFile(path) as archive:
+        data = json.loads(archive.read("data"))
+    # Only recurrent models save the LSTM states of their last rollout
+    return RecurrentPPO if "_last_lstm_states" in data else PPO
+
+
+class ModelCache:
+    """
+    Least-recently-used cache of loaded `RecurrentPPO` and `PPO` models
+
+    Entries are keyed by the model file's real path, modification time and
+    size, so a model saved again under the same path is loaded anew
+    """
+
+    def __init__(self, maxsize: int = 8):
+        """
+        Initialize an empty cache
+
+        Args:
+            - maxsize (int): Maximum number of models kept loaded
+        """
+        self.maxsize = maxsize
+        self._models: OrderedDict[tuple, "RecurrentPPO | PPO"] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str) -> tuple[str, int, int]:
+        """
+        Return the cache key of a model file, raises `FileNotFoundError` if missing
+
+        Like `RecurrentPPO.load`, the path may omit the .zip extension
+        """
+        if not os.path.exists(path) and os.path.exists(path + ".zip"):
+            path += ".zip"
+        stat = os.stat(path)
+        return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+    def load(self, path: str) -> "RecurrentPPO | PPO":
+        """
+        Return the model saved at `path`, loading it if it is not cached
+
+        The model is shared with every other caller, use `RecurrentPPO.load`
+        directly (see `model_class`) for a private copy (e.g. to train it)
+        """
+        key = self.key(path)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+        model = model_class(key[0]).load(key[0])
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+        return model
+
+    def clear(self) -> None:
+        """Drop every cached model"""
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+MODEL_CACHE = ModelCache()
+
+# SHA-256 digests of model files by cache key, so unchanged files are hashed once
+_DIGESTS: dict[tuple[str, int, int], str] = {}
+
+
+def model_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a model file's contents"""
+    key = ModelCache.key(path)
+    if key not in _DIGESTS:
+        digest = hashlib.sha256()
+        with open(key[0], "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        _DIGESTS[key] = digest.hexdigest()
+    return _DIGESTS[key]
+
+
+def load_model(path: str) -> "RecurrentPPO | PPO":
+    """Load a model through the process-wide cache (see `ModelCache.load`)"""
+    return MODEL_CACHE.load(path)
@@ -0,0 +1,155 @@
+"""Torch-free inference of trained `MlpLstmPolicy` actors"""
+
+import numpy as np
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0),
+    "Identity": lambda x: x,
+}
+
+
+def export_model(model_path: str, save_as: str) -> None:
+    """
+    Export the actor half of a saved `RecurrentPPO` model to a NumPy weight file
+
+    Only the parts needed to pick deterministic actions are kept: the actor LSTM,
+    the policy MLP and the action head
+
+    Args:
+        - model_path (str): Path of the saved .zip model
+        - save_as (str): Path of the .npz file to write
+    """
+    from gymnasium import spaces
+    from sb3_contrib import RecurrentPPO
+    from sb3_contrib.common.recurrent.policies import RecurrentActorCriticPolicy
+
+    from pdilem.modelcache import model_class
+
+    if model_class(model_path) is not RecurrentPPO:
+        raise ValueError("Only recurrent models can be exported")
+    policy = RecurrentPPO.load(model_path, device="cpu").policy
+    assert isinstance(policy, RecurrentActorCriticPolicy)
+    if not isinstance(policy.observation_space, spaces.Discrete):
+        raise ValueError("Only discrete observation spaces can be exported")
+    if policy.shared_lstm:
+        raise ValueError("Policies with a shared LSTM cannot be exported")
+    activation = policy.activation_fn.__name__
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation function {activation}")
+
+    weights = {
+        name: tensor.detach().cpu().numpy().astype(np.float32)
+        for name, tensor in policy.state_dict().items()
+    }
+    lstm = policy.lstm_actor
+    arrays = {
+        "n_observations": np.array(policy.observation_space.n),
+        "activation": np.array(activation),
+    }
+    for layer in range(lstm.num_layers):
+        arrays[f"lstm_w_ih_{layer}"] = weights[f"lstm_actor.weight_ih_l{layer}"]
+        arrays[f"lstm_w_hh_{layer}"] = weights[f"lstm_actor.weight_hh_l{layer}"]
+        arrays[f"lstm_b_{layer}"] = (
+            weights[f"lstm_actor.bias_ih_l{layer}"]
+            + weights[f"lstm_actor.bias_hh_l{layer}"]
+        )
+    linear = [
+        name[: -len(".weight")]
+        for name in weights
+        if name.startswith("mlp_extractor.policy_net.") and name.endswith(".weight")
+    ]
+    for i, name in enumerate(linear):
+        arrays[f"mlp_w_{i}"] = weights[f"{name}.weight"]
+        arrays[f"mlp_b_{i}"] = weights[f"{name}.bias"]
+    arrays["action_w"] = weights["action_net.weight"]
+    arrays["action_b"] = weights["action_net.bias"]
+    np.savez(save_as, **arrays)
+
+
+class NumpyPolicy:
+    """Deterministic forward pass of an exported `MlpLstmPolicy` in NumPy"""
+
+    def __init__(self, path: str):
+        """Load weights written by `export_model`"""
+        with np.load(path) as arrays:
+            self.n_observations = int(arrays["n_observations"])
+            self.activation = ACTIVATIONS[str(arrays["activation"])]
+            n_layers = sum(1 for name in arrays.files if name.startswith("lstm_b_"))
+            n_linear = sum(1 for name in arrays.files if name.startswith("mlp_b_"))
+            # Transposed once so every step is a plain `x @ w`
+            self.lstm = [
+                (
+                    arrays[f"lstm_w_ih_{layer}"].T.copy(),
+                    arrays[f"lstm_w_hh_{layer}"].T.copy(),
+                    arrays[f"lstm_b_{layer}"],
+                )
+                for layer in range(n_layers)
+            ]
+            self.mlp = [
+                (arrays[f"mlp_w_{i}"].T.copy(), arrays[f"mlp_b_{i}"])
+                for i in range(n_linear)
+            ]
+            self.action = (arrays["action_w"].T.copy(), arrays["action_b"])
+        self.hidden_size = self.lstm[0][1].shape[0]
+
+    @property
+    def lstm_hidden_state_shape(self) -> tuple[int, int, int]:
+        """Shape of the LSTM states of one game, as in SB3"""
+        return len(self.lstm), 1, self.hidden_size
+
+    def initial_state(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Zeroed hidden and cell states of `n` games"""
+        shape = (len(self.lstm), n, self.hidden_size)
+        return np.zeros(shape, dtype=np.float32), np.zeros(shape, dtype=np.float32)
+
+    def predict(
+        self,
+        observation: np.ndarray,
+        state: tuple[np.ndarray, np.ndarray] | None = None,
+        episode_start: np.ndarray | None = None,
+        deterministic: bool = True,
+    ) -> tuple[np.ndarray, tuple[np.ndarray, np.ndarray]]:
+        """
+        Pick the action of `n` games, same interface as `RecurrentPPO.predict`
+
+        Args:
+            - observation (np.ndarray): (n,) observations
+            - state (tuple | None): (n_layers, n, hidden_size) hidden and cell
+            states, or None for zeroed states
+            - episode_start (np.ndarray | None): (n,) whether each game starts a
+            new episode, which zeroes its states first
+            - deterministic (bool): Must be True, actions are never sampled
+
+        Returns:
+            - tuple: (n,) actions and the new hidden and cell states
+        """
+        assert deterministic, "Only deterministic actions are supported"
+        observation = np.asarray(observation).reshape(-1)
+        if state is None:
+            state = self.initial_state(len(observation))
+        if episode_start is None:
+            episode_start = np.zeros(len(observation), dtype=bool)
+        x = np.eye(self.n_observations, dtype=np.float32)[observation]
+        keep = (1 - np.asarray(episode_start, dtype=np.float32))[:, np.newaxis]
+        hidden_states, cell_states = [], []
+        for layer, (w_ih, w_hh, bias) in enumerate(self.lstm):
+            gates = x @ w_ih + bias
+            # Recurrent terms vanish when every game starts an episode
+            if keep.any():
+                gates += (keep * state[0][layer]) @ w_hh
+            i, f, g, o = np.split(gates, 4, axis=1)
+            cell = _sigmoid(i) * np.tanh(g)
+            if keep.any():
+                cell += _sigmoid(f) * (keep * state[1][layer])
+            x = _sigmoid(o) * np.tanh(cell)
+            hidden_states.append(x)
+            cell_states.append(cell)
+        for w, b in self.mlp:
+            x = self.activation(x @ w + b)
+        logits = x @ self.action[0] + self.action[1]
+        return logits.argmax(axis=1), (np.stack(hidden_states), np.stack(cell_states))
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
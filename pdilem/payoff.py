@@ -0,0 +1,30 @@
+"""Payoff tables for the Prisoner's Dilemma game"""
+
+from typing import Sequence
+
+import numpy as np
+
+# Scores for (cooperate, cooperate), (cooperate, defect), (defect, cooperate)
+# and (defect, defect), from the point of view of the first move
+DEFAULT_PAYOFF_VALUES = (2, 0, 3, 1)
+
+
+def payoff_table(values: Sequence[int] = DEFAULT_PAYOFF_VALUES) -> np.ndarray:
+    """
+    Build a read-only payoff table
+
+    Args:
+        - values (Sequence): Scores for CC, CD, DC and DD (own move first)
+
+    Returns:
+        - np.ndarray: 2x2 table of the row move's score against the column
+        move, indexed by `Move` values
+    """
+    if len(values) != 4:
+        raise ValueError(f"Expected 4 payoff values, got {len(values)}")
+    table = np.array(values, dtype=np.int16).reshape(2, 2)
+    table.setflags(write=False)
+    return table
+
+
+PAYOFF = payoff_table()
@@ -0,0 +1,60 @@
+"""Cache of deterministic policy outputs keyed by the opponent's moves so far"""
+
+from typing import Any, Hashable
+
+# A prefix of opponent moves is keyed as (length, moves packed into an integer,
+# first move at the lowest bit)
+ROOT = (0, 0)
+
+
+def extend(prefix: tuple[int, int], other: int) -> tuple[int, int]:
+    """Return the key of a prefix followed by one more opponent move"""
+    depth, bits = prefix
+    return depth + 1, bits | (int(other) << depth)
+
+
+class PrefixCache:
+    """
+    Bounded map from opponent-move prefixes to an actor's move (and any state
+    needed to continue from it)
+
+    Only valid for actors whose moves are a pure function of the opponent's
+    moves, e.g. a trained policy playing deterministically with fixed weights
+    """
+
+    def __init__(self, max_depth: int = 64, max_entries: int = 10_000):
+        """
+        Initialize an empty cache
+
+        Args:
+            - max_depth (int): Longest prefix cached, later rounds always miss
+            - max_entries (int): Number of prefixes after which nothing more is
+            cached, bounding memory use
+        """
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, prefix: tuple[int, int]) -> Any | None:
+        """Return the value cached for a prefix, or None"""
+        value = self._entries.get(prefix)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, prefix: tuple[int, int], value: Any) -> None:
+        """Cache the value of a prefix, unless it is too deep or the cache is full"""
+        if prefix[0] <= self.max_depth and len(self._entries) < self.max_entries:
+            self._entries[prefix] = value
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the policy's weights changed"""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
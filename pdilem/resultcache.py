@@ -0,0 +1,93 @@
+"""SQLite store of pairing results, addressed by what determines them"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    score1 REAL NOT NULL,
+    score2 REAL NOT NULL
+)
+"""
+
+
+def describe_pairing(
+    identity1: str,
+    identity2: str,
+    matches: int,
+    rounds: int,
+    payoff: np.ndarray,
+    seed: int,
+) -> str:
+    """
+    Return the canonical description of a pairing, from the identities of both
+    actors (see `Actor.identity`) and the match settings
+    """
+    return json.dumps(
+        {
+            "actors": [identity1, identity2],
+            "matches": matches,
+            "rounds": rounds,
+            "payoff": payoff.tolist(),
+            "seed": seed,
+        },
+        sort_keys=True,
+    )
+
+
+class ResultCache:
+    """
+    Mean scores of pairings keyed by the SHA-256 digest of their description,
+    so a pairing is only played again when an actor or setting changed
+
+    Each result is committed as soon as it is stored, an interrupted run keeps
+    the pairings it finished
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the store at `path`"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+    @staticmethod
+    def key(description: str) -> str:
+        """Return the key of a pairing description"""
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def get(self, description: str) -> tuple[float, float] | None:
+        """Return the stored mean scores of a pairing, or None"""
+        row = self._connection.execute(
+            "SELECT score1, score2 FROM results WHERE key = ?",
+            (self.key(description),),
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def put(self, description: str, scores: tuple[float, float]) -> None:
+        """Store the mean scores of a pairing"""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (self.key(description), description, *scores),
+            )
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the store"""
+        self._connection.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,55 @@
+"""Seeded random streams drawn in blocks"""
+
+import numpy as np
+
+SeedLike = int | np.random.SeedSequence | None
+
+
+class BlockRandom:
+    """
+    Stream of uniform floats in [0, 1) from a seeded NumPy generator
+
+    Single draws are served from a block drawn ahead of time and refilled on
+    demand, avoiding a generator call per draw
+    """
+
+    def __init__(self, seed: SeedLike = None, block_size: int = 1024):
+        """
+        Initialize the stream
+
+        Args:
+            - seed (int | SeedSequence | None): Seed of the generator, or None for
+            fresh OS entropy
+            - block_size (int): Number of floats drawn at a time
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self._seed_seq = seed
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._block: list[float] = []
+        self._pos = 0
+
+    def random(self) -> float:
+        """Return the next float of the stream"""
+        if self._pos >= len(self._block):
+            self._block = self.generator.random(self.block_size).tolist()
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+    def draw(self, shape: int | tuple[int, ...]) -> np.ndarray:
+        """
+        Return an array of floats in one call, for vectorized engines
+
+        Continues the same generator, but not the pre-drawn block
+        """
+        return self.generator.random(shape)
+
+    def spawn(self) -> "BlockRandom":
+        """
+        Return an independent stream derived from this one's seed, without
+        drawing from it
+        """
+        return BlockRandom(self._seed_seq.spawn(1)[0], self.block_size)
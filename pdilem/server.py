@@ -0,0 +1,589 @@
+"""Asyncio match server hosting many concurrent games with remote players"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Mapping
+
+import numpy as np
+
+from pdilem.actors.abstracts import Actor, Move
+from pdilem.actors.drl import PolicyActor, predict_moves
+from pdilem.actors.human import HumanActor
+from pdilem.payoff import PAYOFF
+from pdilem.tournament import ActorFactory
+
+DEFAULT_PORT = 8765
+
+# Opponent of a join request asking to play the next remote player who does
+REMOTE = "remote"
+
+MAX_ROUNDS = 10_000
+
+# Moves on the wire, as typed by human players
+_WIRE_MOVES = {"c": Move.COOPERATE, "d": Move.DEFECT}
+
+
+class MatchError(Exception):
+    """Raised when a served game cannot be played (invalid message, aborted game)"""
+
+
+async def send(writer: asyncio.StreamWriter, message: dict[str, Any]) -> None:
+    """
+    Write a message as a JSON line, waiting while the peer is not reading
+    (backpressure)
+    """
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def receive(reader: asyncio.StreamReader) -> dict[str, Any]:
+    """Read a JSON line message, raises `ConnectionError` once the peer is gone"""
+    try:
+        line = await reader.readline()
+    except ValueError as e:
+        # Longer than the reader's buffer limit
+        raise MatchError("Message too long") from e
+    if not line:
+        raise ConnectionError("Connection closed")
+    try:
+        message = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise MatchError(f"Invalid message: {e}") from e
+    if not isinstance(message, dict) or "type" not in message:
+        raise MatchError("Messages must be JSON objects with a type")
+    return message
+
+
+def blocks(actor: Actor) -> bool:
+    """Whether an actor's moves may block the event loop (human input, inference)"""
+    return isinstance(actor, (HumanActor, PolicyActor))
+
+
+class Seat(ABC):
+    """One player of a served game"""
+
+    name: str
+
+    @abstractmethod
+    async def start(self, opponent: str, rounds: int) -> None:
+        """Start a game against the named opponent"""
+
+    @abstractmethod
+    async def ask(self, round_: int) -> None:
+        """Ask the player for their move, without waiting for it"""
+
+    @abstractmethod
+    async def answer(self, round_: int) -> Move | None:
+        """Return the player's move once given, or None if it timed out"""
+
+    @abstractmethod
+    async def result(
+        self, round_: int, move: Move, other: Move, score: int, timed_out: bool
+    ) -> None:
+        """Tell the player what happened in the round"""
+
+    @abstractmethod
+    async def end(self, score: int, other_score: int) -> None:
+        """Tell the player the game is over"""
+
+    async def abort(self, reason: str) -> None:
+        """Tell the player, if still connected, that the game was aborted"""
+
+
+class PolicyBatcher:
+    """
+    Plays the moves asked of policy actors across games in batches, one forward
+    pass per model (see `predict_moves`)
+
+    Moves asked while a model's pass runs wait for its next pass, so batches
+    grow with the number of games rather than adding a pass per game
+    """
+
+    def __init__(self, executor: Executor | None = None):
+        """Run the passes in `executor`, or the event loop's default one if None"""
+        self.executor = executor
+        self.passes = 0
+        # Actors waiting for their move, and the futures to set, by model
+        self._pending: dict[int, list[tuple[PolicyActor, asyncio.Future]]] = {}
+        self._running: set[int] = set()
+
+    def move(self, actor: PolicyActor) -> asyncio.Future:
+        """Return a future of the actor's next move"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(actor.model)
+        pending = self._pending.setdefault(key, [])
+        pending.append((actor, future))
+        if len(pending) == 1 and key not in self._running:
+            # Other games asking in this iteration of the loop join the pass
+            loop.call_soon(self._run, key)
+        return future
+
+    def _run(self, key: int) -> None:
+        """Start a pass over the actors waiting for a model"""
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        self._running.add(key)
+        self.passes += 1
+        loop = asyncio.get_running_loop()
+        actors = [actor for actor, _ in batch]
+        task = loop.run_in_executor(self.executor, predict_moves, actors)
+        task.add_done_callback(lambda task: self._done(key, batch, task))
+
+    def _done(self, key: int, batch: list, task: asyncio.Future) -> None:
+        """Hand out the moves of a pass and start the next one"""
+        self._running.discard(key)
+        for j, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result()[j])
+        if key in self._pending:
+            self._run(key)
+
+
+class ActorSeat(Seat):
+    """
+    Server-side actor, moves that may block run off the event loop so it keeps
+    serving other games (and the other player can move meanwhile)
+    """
+
+    def __init__(
+        self,
+        actor: Actor,
+        executor: Executor | None = None,
+        batcher: PolicyBatcher | None = None,
+    ):
+        """
+        Initialize the seat
+
+        Args:
+            - actor (Actor): The actor, owned by this game
+            - executor (Executor | None): Executor for blocking moves, or None to
+            use the event loop's default one
+            - batcher (PolicyBatcher | None): Batcher playing the moves of policy
+            actors, or None to play them in the executor one at a time
+        """
+        self.actor = actor
+        self.name = actor.name
+        self.executor = executor
+        self.batcher = batcher
+        self._blocks = blocks(actor)
+        self._move: Move | asyncio.Future | None = None
+
+    async def start(self, opponent, rounds):
+        self.actor.reset()
+        self.actor.total_score = 0
+
+    async def ask(self, round_):
+        if self.batcher is not None and isinstance(self.actor, PolicyActor):
+            self._move = self.batcher.move(self.actor)
+        elif self._blocks:
+            loop = asyncio.get_running_loop()
+            self._move = loop.run_in_executor(self.executor, self.actor.move)
+        else:
+            self._move = self.actor.move()
+
+    async def answer(self, round_):
+        if isinstance(self._move, asyncio.Future):
+            return await self._move
+        return self._move
+
+    async def result(self, round_, move, other, score, timed_out):
+        self.actor.total_score += score
+        self.actor.result(other, score)
+
+    async def end(self, score, other_score):
+        pass
+
+
+class RemoteSeat(Seat):
+    """Player connected over TCP, who has `timeout` seconds to send each move"""
+
+    def __init__(
+        self,
+        name: str,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        timeout: float,
+    ):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self._deadline = 0.0
+
+    async def start(self, opponent, rounds):
+        await send(
+            self.writer,
+            {
+                "type": "start",
+                "opponent": opponent,
+                "rounds": rounds,
+                "timeout": self.timeout,
+            },
+        )
+
+    async def ask(self, round_):
+        await send(self.writer, {"type": "round", "round": round_})
+        self._deadline = asyncio.get_running_loop().time() + self.timeout
+
+    async def answer(self, round_):
+        # The move may already have arrived while the other player was answering
+        timeout = max(0.0, self._deadline - asyncio.get_running_loop().time())
+        try:
+            return await asyncio.wait_for(self._read_move(round_), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _read_move(self, round_: int) -> Move:
+        while True:
+            message = await receive(self.reader)
+            if message["type"] != "move":
+                raise MatchError(f"Expected a move, got {message['type']}")
+            # Moves sent after their round timed out are dropped
+            if message.get("round") == round_:
+                break
+        if message.get("move") not in _WIRE_MOVES:
+            raise MatchError("Moves must be 'c' or 'd'")
+        return _WIRE_MOVES[message["move"]]
+
+    async def result(self, round_, move, other, score, timed_out):
+        await send(
+            self.writer,
+            {
+                "type": "result",
+                "round": round_,
+                "move": "cd"[move],
+                "other": "cd"[other],
+                "score": score,
+                "timeout": timed_out,
+            },
+        )
+
+    async def end(self, score, other_score):
+        await send(
+            self.writer, {"type": "end", "score": score, "other_score": other_score}
+        )
+
+    async def abort(self, reason):
+        try:
+            await send(self.writer, {"type": "error", "message": reason})
+        except (ConnectionError, OSError):
+            pass
+
+
+async def play_game(
+    seat1: Seat,
+    seat2: Seat,
+    rounds: int,
+    payoff: np.ndarray = PAYOFF,
+    timeout_move: Move = Move.COOPERATE,
+) -> tuple[int, int]:
+    """
+    Play a game between two seats, asking both for their move before waiting
+    for either every round
+
+    Args:
+        - seat1 (Seat): First player
+        - seat2 (Seat): Second player
+        - rounds (int): Number of rounds
+        - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+        - timeout_move (Move): Move played for a player whose move timed out
+
+    Returns:
+        - tuple: Total scores of both players
+    """
+    table = payoff.tolist()
+    totals = [0, 0]
+    await seat1.start(seat2.name, rounds)
+    await seat2.start(seat1.name, rounds)
+    for round_ in range(1, rounds + 1):
+        await seat1.ask(round_)
+        await seat2.ask(round_)
+        move1 = await seat1.answer(round_)
+        move2 = await seat2.answer(round_)
+        timed_out1, timed_out2 = move1 is None, move2 is None
+        move1 = timeout_move if move1 is None else move1
+        move2 = timeout_move if move2 is None else move2
+        score1, score2 = table[move1][move2], table[move2][move1]
+        totals[0] += score1
+        totals[1] += score2
+        await seat1.result(round_, move1, move2, score1, timed_out1)
+        await seat2.result(round_, move2, move1, score2, timed_out2)
+    await seat1.end(*totals)
+    await seat2.end(totals[1], totals[0])
+    return totals[0], totals[1]
+
+
+class MatchServer:
+    """
+    TCP server of games between remote players and server-side actors
+
+    Messages are JSON lines. A player joins with
+    `{"type": "join", "name": ..., "opponent": ..., "rounds": ...}`, the opponent
+    being a server-side actor or `REMOTE` to play the next remote player to
+    join. The server then sends `start`, and every round `round`, to be answered
+    with `{"type": "move", "round": ..., "move": "c" | "d"}` within the round
+    timeout, followed by `result`. The game finishes with `end`, or `error` if
+    it is aborted
+
+    At most `max_games` games are played at once, players beyond that are sent
+    `wait` and queued. Writes wait for slow readers, so a player who stops
+    reading only holds up their own game
+    """
+
+    def __init__(
+        self,
+        factories: Mapping[str, ActorFactory],
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        round_timeout: float = 30.0,
+        max_games: int = 1000,
+        payoff: np.ndarray = PAYOFF,
+        timeout_move: Move = Move.COOPERATE,
+    ):
+        """
+        Initialize the server
+
+        Args:
+            - factories (Mapping): Callables building each server-side actor,
+            by name
+            - host (str): Interface to listen on
+            - port (int): Port to listen on, or 0 for any free port
+            - round_timeout (float): Seconds a remote player has to move
+            - max_games (int): Maximum number of games played at once
+            - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+            - timeout_move (Move): Move played for a player whose move timed out
+        """
+        self.factories = factories
+        self.host = host
+        self.port = port
+        self.round_timeout = round_timeout
+        self.payoff = payoff
+        self.timeout_move = timeout_move
+        self.games_played = 0
+        self.games_aborted = 0
+        self._slots = asyncio.Semaphore(max_games)
+        # Remote players waiting for a remote opponent, with their rounds, a
+        # future set once their game is over and a read watching for disconnects
+        self._lobby: list[tuple[RemoteSeat, int, asyncio.Future, asyncio.Future]] = []
+        # Server-side actors are built (loading their model) off the event loop,
+        # on a thread of their own so loads never hold up moves
+        self._load_executor = ThreadPoolExecutor(max_workers=1)
+        # DRL actors move in passes batched across games, one at a time
+        self._inference_executor = ThreadPoolExecutor(max_workers=1)
+        self.batcher = PolicyBatcher(self._inference_executor)
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        """Start listening, `port` is then the actual port"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve(self) -> None:
+        """Start listening and serve until cancelled"""
+        await self.start()
+        assert self._server is not None
+        print(f"Serving games on {self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening for new players"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._load_executor.shutdown(wait=False)
+        self._inference_executor.shutdown(wait=False)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one connection, from its join request to the end of its game"""
+        try:
+            join = await asyncio.wait_for(receive(reader), self.round_timeout)
+            name, opponent, rounds = self._parse_join(join)
+            seat = RemoteSeat(name, reader, writer, self.round_timeout)
+            if opponent == REMOTE:
+                await self._pair(seat, rounds)
+            else:
+                # Building an actor may load a model, off the event loop too
+                loop = asyncio.get_running_loop()
+                actor = await loop.run_in_executor(
+                    self._load_executor, self.factories[opponent]
+                )
+                await self._play(seat, ActorSeat(actor, batcher=self.batcher), rounds)
+        except (MatchError, asyncio.TimeoutError) as e:
+            message = str(e) or "Timed out waiting to join"
+            try:
+                await send(writer, {"type": "error", "message": message})
+            except (ConnectionError, OSError):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    def _parse_join(self, join: dict[str, Any]) -> tuple[str, str, int]:
+        """Return the name, opponent and rounds of a join request"""
+        name, opponent, rounds = (
+            join.get("name"),
+            join.get("opponent"),
+            join.get("rounds"),
+        )
+        if join["type"] != "join" or not isinstance(name, str):
+            raise MatchError("Expected a join request with a name")
+        if not isinstance(opponent, str) or (
+            opponent != REMOTE and opponent not in self.factories
+        ):
+            raise MatchError(f"Unknown opponent {opponent}")
+        # bool is a subclass of int, but `true` is not a number of rounds
+        if (
+            not isinstance(rounds, int)
+            or isinstance(rounds, bool)
+            or not 0 < rounds <= MAX_ROUNDS
+        ):
+            raise MatchError(f"Rounds must be an integer in [1, {MAX_ROUNDS}]")
+        return name, opponent, rounds
+
+    async def _pair(self, seat: RemoteSeat, rounds: int) -> None:
+        """
+        Play the first waiting remote player with their number of rounds, or
+        wait to be played
+
+        Waiting players are watched for disconnects, so nobody is paired with
+        a player who already left
+        """
+        while self._lobby:
+            waiting, waiting_rounds, done, watcher = self._lobby.pop(0)
+            # The game reads the waiting player's messages from now on
+            watcher.cancel()
+            await asyncio.wait([watcher])
+            if not watcher.cancelled():
+                # They left, or spoke out of turn, just before being paired
+                done.set_result(None)
+                continue
+            try:
+                await self._play(waiting, seat, waiting_rounds)
+            finally:
+                if not done.done():
+                    done.set_result(None)
+            return
+
+        loop = asyncio.get_running_loop()
+        # Waiting players send nothing, a read completes once they leave (or
+        # break the protocol)
+        watcher = asyncio.ensure_future(seat.reader.read(1))
+        entry = (seat, rounds, loop.create_future(), watcher)
+        self._lobby.append(entry)
+        try:
+            await send(seat.writer, {"type": "wait"})
+            await asyncio.wait([entry[2], watcher], return_when=asyncio.FIRST_COMPLETED)
+            if watcher.done() and not watcher.cancelled():
+                if entry in self._lobby:
+                    self._lobby.remove(entry)
+                    entry[2].set_result(None)
+                if watcher.exception() is None and watcher.result():
+                    raise MatchError("Unexpected message while waiting for an opponent")
+            await entry[2]
+        finally:
+            watcher.cancel()
+            if entry in self._lobby:
+                self._lobby.remove(entry)
+
+    async def _play(self, seat1: Seat, seat2: Seat, rounds: int) -> None:
+        """Play a game once a slot is free, aborting it if a player fails"""
+        if self._slots.locked():
+            for seat in (seat1, seat2):
+                if isinstance(seat, RemoteSeat):
+                    await send(seat.writer, {"type": "wait"})
+        async with self._slots:
+            try:
+                await play_game(seat1, seat2, rounds, self.payoff, self.timeout_move)
+                self.games_played += 1
+            except (MatchError, ConnectionError, OSError) as e:
+                self.games_aborted += 1
+                reason = f"Game aborted: {e}"
+                for seat in (seat1, seat2):
+                    await seat.abort(reason)
+
+
+async def play_remote(
+    actor: Actor,
+    opponent: str,
+    rounds: int,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+) -> tuple[int, int]:
+    """
+    Play an actor in a served game, as a remote player (a local stand-in for
+    human or bot clients)
+
+    Args:
+        - actor (Actor): The local actor, e.g. `HumanActor` to play from the terminal
+        - opponent (str): Name of a server-side actor, or `REMOTE`
+        - rounds (int): Number of rounds
+        - host (str): Address of the server
+        - port (int): Port of the server
+
+    Returns:
+        - tuple: Total scores of the actor and its opponent
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    blocking = blocks(actor)
+    try:
+        join = {"type": "join", "name": actor.name, "opponent": opponent}
+        await send(writer, {**join, "rounds": rounds})
+        actor.reset()
+        actor.total_score = 0
+        while True:
+            message = await receive(reader)
+            kind = message["type"]
+            if kind == "round":
+                if actor.verbose:
+                    label = f"Round {message['round']}"
+                    print(f"{label:-^40s}")
+                if blocking:
+                    move = await loop.run_in_executor(None, actor.move)
+                else:
+                    move = actor.move()
+                reply = {"type": "move", "round": message["round"]}
+                await send(writer, {**reply, "move": "cd"[move]})
+            elif kind == "result":
+                other = _WIRE_MOVES[message["other"]]
+                actor.total_score += message["score"]
+                actor.result(other, message["score"])
+                if actor.verbose:
+                    timed_out = " (timed out)" if message["timeout"] else ""
+                    print(
+                        f"\tYou: {_WIRE_MOVES[message['move']].meaning()}{timed_out}"
+                        f" ({message['score']}), opponent: {other.meaning()}"
+                    )
+            elif kind == "start" and actor.verbose:
+                print(
+                    f"Playing {message['opponent']} for {message['rounds']} rounds, "
+                    f"{message['timeout']:g} s per move"
+                )
+            elif kind == "wait" and actor.verbose:
+                print("Waiting for an opponent...")
+            elif kind == "end":
+                return message["score"], message["other_score"]
+            elif kind == "error":
+                raise MatchError(message["message"])
+    finally:
+        writer.close()
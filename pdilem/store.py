@@ -0,0 +1,171 @@
+"""Compact on-disk store of match histories"""
+
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+# One record per match: where its packed moves and metadata start, and its length
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("rounds", "<u4"), ("meta_offset", "<u8")])
+
+DATA_FILE = "moves.bin"
+INDEX_FILE = "index.bin"
+META_FILE = "meta.jsonl"
+
+# Bytes of index records held back before the writer flushes on its own
+INDEX_BUFFER_SIZE = 1 << 16
+
+
+def pack_moves(moves: np.ndarray) -> np.ndarray:
+    """
+    Pack a (rounds, 2) array of moves into 2 bits per round, 4 rounds per byte
+
+    Each round is stored as `move1 | move2 << 1`, starting at the low bits
+    """
+    codes = (moves[:, 0] & 1) | ((moves[:, 1] & 1) << 1)
+    codes = np.pad(codes.astype(np.uint8), (0, -len(codes) % 4)).reshape(-1, 4)
+    return codes[:, 0] | codes[:, 1] << 2 | codes[:, 2] << 4 | codes[:, 3] << 6
+
+
+def unpack_moves(packed: np.ndarray, rounds: int) -> np.ndarray:
+    """Inverse of `pack_moves`, returns a (rounds, 2) int8 array of moves"""
+    codes = (packed[:, np.newaxis] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    codes = codes.reshape(-1)[:rounds]
+    return np.stack([codes & 1, codes >> 1], axis=1).astype(np.int8)
+
+
+class HistoryWriter:
+    """
+    Append-only writer of match histories to a store directory
+
+    Index records are held back until the moves and metadata they point to are
+    flushed, so readers never see a record past the end of the other files
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the store at `path` for appending"""
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._data = open(os.path.join(path, DATA_FILE), "ab")
+        self._index = open(os.path.join(path, INDEX_FILE), "ab")
+        self._meta = open(os.path.join(path, META_FILE), "ab")
+        self._pending = bytearray()
+
+    def append(self, moves: np.ndarray, **metadata: Any) -> None:
+        """
+        Append one match
+
+        Args:
+            - moves (np.ndarray): (rounds, 2) array of both actors' moves, e.g.
+            `GameHistory.moves` from `Game.run_headless`
+            - metadata: JSON-serializable match details, e.g. actor names,
+            model file and seed
+        """
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["offset"] = self._data.tell()
+        record["rounds"] = len(moves)
+        record["meta_offset"] = self._meta.tell()
+        self._data.write(pack_moves(moves).tobytes())
+        self._meta.write(json.dumps(metadata).encode() + b"\n")
+        self._pending += record.tobytes()
+        if len(self._pending) >= INDEX_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Make appended matches visible to readers"""
+        self._data.flush()
+        self._meta.flush()
+        self._index.write(self._pending)
+        self._index.flush()
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Flush and close the store"""
+        self.flush()
+        for file in (self._data, self._meta, self._index):
+            file.close()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class HistoryReader:
+    """Memory-mapped reader of a store directory written by `HistoryWriter`"""
+
+    def __init__(self, path: str):
+        """Map the store at `path`, matches appended afterwards are not visible"""
+        self.path = path
+        self.index = self._map(INDEX_FILE, INDEX_DTYPE)
+        self.data = self._map(DATA_FILE, np.dtype(np.uint8))
+
+    def _map(self, filename: str, dtype: np.dtype) -> np.ndarray:
+        """Read-only map of a whole number of records, empty if there are none"""
+        file_path = os.path.join(self.path, filename)
+        count = os.path.getsize(file_path) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", shape=(count,))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def total_rounds(self) -> int:
+        """Number of rounds over all matches"""
+        return int(self.index["rounds"].sum(dtype=np.int64))
+
+    @property
+    def round_offsets(self) -> np.ndarray:
+        """
+        Start of every match in the rounds of all matches, with the total number
+        of rounds appended, so match `i` spans `offsets[i]:offsets[i + 1]`
+        """
+        offsets = np.zeros(len(self.index) + 1, dtype=np.int64)
+        np.cumsum(self.index["rounds"], out=offsets[1:])
+        return offsets
+
+    def unpack(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """
+        Return the moves of matches `start` to `stop` (default: all matches) as
+        one (rounds, 2) int8 array, in one pass over their packed moves
+
+        Match `i` spans rounds `offsets[i - start]:offsets[i + 1 - start]`, with
+        `offsets = round_offsets[start : stop + 1] - round_offsets[start]`
+        """
+        index = self.index[start:stop]
+        if not len(index):
+            return np.zeros((0, 2), dtype=np.int8)
+        rounds = index["rounds"].astype(np.int64)
+        # Matches are appended back to back, each starting on a new byte
+        first = int(index[0]["offset"])
+        end = int(index[-1]["offset"]) + (int(rounds[-1]) + 3) // 4
+        codes = self.data[first:end, np.newaxis] >> np.array(
+            [0, 2, 4, 6], dtype=np.uint8
+        )
+        codes = (codes & 3).reshape(-1)
+        # Position of every round in the codes, skipping each match's padding
+        starts = (index["offset"].astype(np.int64) - first) * 4
+        offsets = np.zeros(len(rounds), dtype=np.int64)
+        np.cumsum(rounds[:-1], out=offsets[1:])
+        position = np.arange(int(rounds.sum())) + np.repeat(starts - offsets, rounds)
+        codes = codes[position]
+        return np.stack([codes & 1, codes >> 1], axis=1).astype(np.int8)
+
+    def packed(self, i: int) -> np.ndarray:
+        """Zero-copy view of match `i`'s packed moves (see `pack_moves`)"""
+        offset, rounds = int(self.index[i]["offset"]), int(self.index[i]["rounds"])
+        return self.data[offset : offset + (rounds + 3) // 4]
+
+    def moves(self, i: int) -> np.ndarray:
+        """Return match `i`'s moves as a (rounds, 2) int8 array"""
+        return unpack_moves(self.packed(i), int(self.index[i]["rounds"]))
+
+    def metadata(self, i: int) -> dict[str, Any]:
+        """Return match `i`'s metadata"""
+        with open(os.path.join(self.path, META_FILE), "rb") as file:
+            file.seek(int(self.index[i]["meta_offset"]))
+            return json.loads(file.readline())
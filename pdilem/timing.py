@@ -0,0 +1,36 @@
+"""Low-overhead accumulation of wall time per stage of a loop"""
+
+import time
+
+# Clock used by every timed stage
+clock = time.perf_counter
+
+
+class StageTimer:
+    """
+    Accumulated wall time and call count per named stage
+
+    Instrumented code only holds a timer when profiling, and otherwise skips
+    timing entirely with a single `is None` check
+    """
+
+    def __init__(self):
+        """Initialize a timer with no stages"""
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add one timed call of a stage"""
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def merge(self, other: "StageTimer") -> None:
+        """Add another timer's stages to this one"""
+        for stage, seconds in other.totals.items():
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + other.counts[stage]
+
+    def reset(self) -> None:
+        """Forget all stages"""
+        self.totals.clear()
+        self.counts.clear()
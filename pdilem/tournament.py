@@ -0,0 +1,164 @@
+"""Round-robin tournaments between actors"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Sequence
+
+import numpy as np
+
+from pdilem.actors.abstracts import Actor
+from pdilem.batchgame import BatchGame
+from pdilem.payoff import PAYOFF
+from pdilem.resultcache import ResultCache, describe_pairing
+
+ActorFactory = Callable[[], Actor]
+
+
+def play_pairing(
+    factory1: ActorFactory,
+    factory2: ActorFactory,
+    matches: int,
+    rounds: int,
+    seed: int | None = None,
+    payoff: np.ndarray = PAYOFF,
+) -> tuple[float, float]:
+    """
+    Play repeated matches between two actors
+
+    Returns:
+        - tuple: Mean score per match of the first and second actors
+    """
+    game = BatchGame([(factory1(), factory2())], matches, seed=seed, payoff=payoff)
+    scores1, scores2 = game.run(rounds)
+    return float(scores1.mean()), float(scores2.mean())
+
+
+class TournamentResult:
+    """Outcome of a round-robin tournament"""
+
+    def __init__(self, names: list[str], scores: np.ndarray, played: int = 0):
+        """
+        Initialize the result
+
+        Args:
+            - names (list): Actor names, in matrix order
+            - scores (np.ndarray): Mean score per match of the row actor
+            against the column actor
+            - played (int): Number of pairings played, the others were read
+            from a result cache
+        """
+        self.names = names
+        self.scores = scores
+        self.played = played
+
+    def ranking(self) -> list[tuple[str, float]]:
+        """Return (name, mean score against all opponents), best first"""
+        means = self.scores.mean(axis=1)
+        order = np.argsort(-means, kind="stable")
+        return [(self.names[i], float(means[i])) for i in order]
+
+    def print(self) -> None:
+        """Print the score matrix and the ranking"""
+        width = max(8, *(len(name) + 2 for name in self.names))
+        print("\nScore matrix (mean score of row actor against column actor):")
+        print(" " * width + "".join(f"{name:>{width}s}" for name in self.names))
+        for name, row in zip(self.names, self.scores):
+            print(f"{name:<{width}s}" + "".join(f"{s:>{width}.1f}" for s in row))
+        print("\nRanking:")
+        for place, (name, mean) in enumerate(self.ranking(), start=1):
+            print(f"\t{place}. {name} ({mean:.1f})")
+        print()
+
+
+def round_robin(
+    names: Sequence[str],
+    factories: Sequence[ActorFactory],
+    matches: int,
+    rounds: int,
+    workers: int | None = None,
+    seed: int | None = None,
+    payoff: np.ndarray = PAYOFF,
+    cache: ResultCache | None = None,
+    identities: Sequence[str | None] | None = None,
+) -> TournamentResult:
+    """
+    Play every pairing of the actors, including self-play, over a process pool
+
+    With a cache, pairings of actors with an identity (see `Actor.identity`) are
+    only played if their result is not stored yet. Their seed is then derived
+    from the pairing's description, and they are played in identity order, so
+    results do not depend on which other actors take part or on actor order
+
+    Args:
+        - names (Sequence): Actor names, in matrix order
+        - factories (Sequence): Picklable callables building each actor
+        - matches (int): Number of matches per pairing
+        - rounds (int): Number of rounds per match
+        - workers (int | None): Number of worker processes, or None for one per core
+        - seed (int | None): Seed from which each pairing's seed is derived
+        - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+        - cache (ResultCache | None): Store of pairing results to reuse and
+        extend, which needs a seed
+        - identities (Sequence | None): Identity of each actor, or None to build
+        every actor once to get it
+
+    Returns:
+        - TournamentResult: The score matrix and ranking
+    """
+    pairs = list(itertools.combinations_with_replacement(range(len(names)), 2))
+    seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(len(pairs))]
+    descriptions: list[str | None] = [None] * len(pairs)
+    if cache is not None:
+        if seed is None:
+            raise ValueError("Tournament results can only be cached with a seed")
+        if identities is None:
+            identities = [factory().identity() for factory in factories]
+        for p, (i, j) in enumerate(pairs):
+            identity1, identity2 = identities[i], identities[j]
+            if identity1 is None or identity2 is None:
+                continue
+            if identity2 < identity1:
+                pairs[p] = j, i
+                identity1, identity2 = identity2, identity1
+            description = describe_pairing(
+                identity1, identity2, matches, rounds, payoff, seed
+            )
+            descriptions[p] = description
+            seeds[p] = int(ResultCache.key(description)[:8], 16)
+
+    results: dict[int, tuple[float, float]] = {}
+    for p, description in enumerate(descriptions):
+        if cache is not None and description is not None:
+            cached = cache.get(description)
+            if cached is not None:
+                results[p] = cached
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                play_pairing,
+                factories[pairs[p][0]],
+                factories[pairs[p][1]],
+                matches,
+                rounds,
+                seeds[p],
+                payoff,
+            ): p
+            for p in range(len(pairs))
+            if p not in results
+        }
+        for future, p in futures.items():
+            results[p] = future.result()
+            description = descriptions[p]
+            if cache is not None and description is not None:
+                cache.put(description, results[p])
+
+    scores = np.zeros((len(names), len(names)))
+    for p, (i, j) in enumerate(pairs):
+        score1, score2 = results[p]
+        if i == j:
+            scores[i, i] = (score1 + score2) / 2
+        else:
+            scores[i, j], scores[j, i] = score1, score2
+
+    return TournamentResult(list(names), scores, len(futures))
@@ -0,0 +1,268 @@
+"""Natively batched environment for the Prisoner's Dilemma game"""
+
+from typing import Any, Sequence
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices
+
+from pdilem.actors.abstracts import Actor
+from pdilem.actors.fsm import FSMBatch
+from pdilem.history import MoveHistory, history_space
+from pdilem.lookahead import Lookahead
+from pdilem.payoff import PAYOFF
+from pdilem.store import HistoryWriter
+from pdilem.timing import StageTimer, clock
+
+
+class PDVecEnv(VecEnv):
+    """
+    `num_envs` independent `PDEnv` episodes stepped together as NumPy arrays
+
+    Every slot samples its own opponent from the opponent selection at each
+    episode start, and opponents keep their state in actor batches, so
+    built-in logic opponents never go through per-slot Python calls
+    """
+
+    def __init__(
+        self,
+        opponents: list[Actor] | Actor,
+        episode_len: int = 50,
+        lookahead_depth: int | None = 0,
+        num_envs: int = 8,
+        seed: int | None = None,
+        payoff: np.ndarray = PAYOFF,
+        expected_lookahead: bool = False,
+        history_len: int = 0,
+        history_writer: HistoryWriter | None = None,
+        history_metadata: dict[str, Any] | None = None,
+        timer: StageTimer | None = None,
+    ):
+        """
+        Initialize the environment
+
+        Args:
+            - opponents (list | Actor): Pre-initialized opponent selection
+            - episode_len (int): Number of steps per episode
+            - lookahead_depth (int | None): Number of steps to look ahead,
+            or None for full lookahead, or 0 for no lookahead
+            - num_envs (int): Number of episodes stepped in parallel
+            - seed (int | None): Random seed for opponent selection and opponents
+            - payoff (np.ndarray): 2x2 payoff table (see `pdilem.payoff`)
+            - expected_lookahead (bool): Whether the lookahead finds the expected
+            optimal score against stochastic opponents (see `Lookahead`)
+            - history_len (int): Number of past rounds observed (see `PDEnv`)
+            - history_writer (HistoryWriter | None): Store to append the moves of
+            every finished episode to, or None to not record them
+            - history_metadata (dict | None): Details recorded with every episode
+            (see `PDEnv`)
+            - timer (StageTimer | None): Timer accumulating the wall time of each
+            stage of a step (same stages as `PDEnv`), or None to not time them
+        """
+        self.render_mode = None
+        # Same spaces as `PDEnv`
+        observation_space = (
+            history_space(history_len) if history_len > 0 else spaces.Discrete(3)
+        )
+        super().__init__(num_envs, observation_space, spaces.Discrete(2))
+        self._history = MoveHistory(history_len, num_envs) if history_len > 0 else None
+        self._total_steps = episode_len
+        self._lookahead_depth = lookahead_depth
+        self._payoff = payoff
+        self._lookahead = Lookahead(payoff, expected=expected_lookahead)
+        self._opponent_actors = (
+            opponents if isinstance(opponents, list) else [opponents]
+        )
+        self._rng = np.random.default_rng(seed)
+        self._opponent_batches = [
+            actor.batch(num_envs, self._rng) for actor in self._opponent_actors
+        ]
+        self._opponent_idx = np.zeros(num_envs, dtype=np.intp)
+        self._step_num = np.zeros(num_envs, dtype=np.int64)
+        self._observation = np.full(num_envs, 2, dtype=np.int64)
+        self._actions = np.zeros(num_envs, dtype=np.int8)
+        self._history_writer = history_writer
+        self._history_metadata = history_metadata or {}
+        # Moves of every slot's episode so far, both players per round
+        self._episode_moves = np.zeros((num_envs, episode_len, 2), dtype=np.int8)
+        # Seed of the last seeded reset, and the number of episodes started since
+        self._seed = seed
+        self._episodes = 0
+        self._episode_number = np.zeros(num_envs, dtype=np.int64)
+        self.timer = timer
+
+    def _reset_slots(self, idx: np.ndarray) -> None:
+        """Start new episodes in the selected slots with newly sampled opponents"""
+        self._opponent_idx[idx] = self._rng.integers(
+            len(self._opponent_actors), size=len(idx)
+        )
+        for batch in self._opponent_batches:
+            batch.reset(idx)
+        self._step_num[idx] = 0
+        self._episode_number[idx] = self._episodes + np.arange(len(idx))
+        self._episodes += len(idx)
+        self._observation[idx] = 2
+        if self._history is not None:
+            self._history.clear(idx)
+
+    def _get_obs(self) -> np.ndarray:
+        """Observations of every slot (see `PDEnv._get_obs`)"""
+        if self._history is not None:
+            return self._history.observation()
+        return self._observation.copy()
+
+    def _optimal_ad_scores(self) -> np.ndarray:
+        """Optimal achievable additional score of every slot (see `PDEnv`)"""
+        scores = np.zeros(self.num_envs, dtype=np.float64)
+        if self._lookahead_depth == 0:
+            return scores
+        remaining = self._lookahead_depth or self._total_steps
+        for k, (actor, batch) in enumerate(
+            zip(self._opponent_actors, self._opponent_batches)
+        ):
+            idx = np.flatnonzero(self._opponent_idx == k)
+            if not idx.size or not actor.cloneable:
+                continue
+            if self._lookahead.expected and isinstance(batch, FSMBatch):
+                # Expected scores of every state at once, looked up per slot
+                values = self._lookahead.fsm_values(batch.fsm, remaining)
+                scores[idx] = values[batch.state[idx]]
+                continue
+            for i in idx:
+                scores[i] = self._lookahead.optimal_score(batch.actor_at(i), remaining)
+        return scores
+
+    def reset(self):
+        """Reset every slot, returns the initial observations"""
+        start = clock() if self.timer is not None else 0.0
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+            for batch in self._opponent_batches:
+                batch.rng = self._rng
+            self._seed = self._seeds[0]
+            self._episodes = 0
+        self._reset_seeds()
+        self._reset_slots(np.arange(self.num_envs))
+        optimal_ad = self._optimal_ad_scores()
+        self.reset_infos = [
+            {"delta": 0, "optimal_ad": float(score)} for score in optimal_ad
+        ]
+        if self.timer is not None:
+            self.timer.add("reset", clock() - start)
+        return self._get_obs()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int8).reshape(self.num_envs)
+
+    def step_wait(self):
+        """
+        Step every slot with the actions from `step_async`, starting a new
+        episode in finished slots (their last observation is in the info)
+
+        Returns:
+            - tuple: observations, rewards, dones and infos of all slots
+        """
+        timer = self.timer
+        start = clock() if timer is not None else 0.0
+        actions = self._actions
+        opponent_moves = np.empty(self.num_envs, dtype=np.int8)
+        slots = [
+            np.flatnonzero(self._opponent_idx == k)
+            for k in range(len(self._opponent_batches))
+        ]
+        for batch, idx in zip(self._opponent_batches, slots):
+            if idx.size:
+                opponent_moves[idx] = batch.move(idx)
+
+        delta = self._payoff[actions, opponent_moves]
+        opponent_delta = self._payoff[opponent_moves, actions]
+        for batch, idx in zip(self._opponent_batches, slots):
+            if idx.size:
+                batch.result(actions[idx], opponent_delta[idx], idx)
+
+        opponent_end = clock() if timer is not None else 0.0
+        if timer is not None:
+            timer.add("opponent", opponent_end - start)
+        self._step_num += 1
+        self._observation[:] = opponent_moves
+        if self._history is not None:
+            self._history.push(actions, opponent_moves)
+        if self._history_writer is not None:
+            rounds = self._step_num - 1
+            self._episode_moves[np.arange(self.num_envs), rounds, 0] = actions
+            self._episode_moves[np.arange(self.num_envs), rounds, 1] = opponent_moves
+        optimal_ad = self._optimal_ad_scores()
+        reward_end = clock() if timer is not None else 0.0
+        if timer is not None:
+            timer.add("reward", reward_end - opponent_end)
+        rewards = (delta + optimal_ad).astype(np.float32)
+        dones = self._step_num >= self._total_steps
+        infos: list[dict[str, Any]] = [
+            {"delta": int(d), "optimal_ad": float(o)} for d, o in zip(delta, optimal_ad)
+        ]
+
+        observations = self._get_obs()
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            for i in done_idx:
+                infos[i]["terminal_observation"] = observations[i]
+            if self._history_writer is not None:
+                self._record(done_idx)
+            self._reset_slots(done_idx)
+            observations = self._get_obs()
+
+        if timer is not None:
+            timer.add("observation", clock() - reward_end)
+        return observations, rewards, dones, infos
+
+    def _record(self, idx: np.ndarray) -> None:
+        """Append the finished episodes of the selected slots to the store"""
+        assert self._history_writer is not None
+        for i in idx:
+            self._history_writer.append(
+                self._episode_moves[i],
+                **self._history_metadata,
+                opponent=self._opponent_actors[self._opponent_idx[i]].name,
+                lookahead_depth=self._lookahead_depth,
+                payoff=self._payoff.ravel().tolist(),
+                seed=self._seed,
+                episode=int(self._episode_number[i]),
+            )
+
+    def close(self) -> None:
+        """Nothing to clean up"""
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        """Attributes are shared by all slots"""
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(
+        self, attr_name: str, value: Any, indices: VecEnvIndices = None
+    ) -> None:
+        """Attributes are shared by all slots"""
+        setattr(self, attr_name, value)
+
+    def env_method(
+        self,
+        method_name: str,
+        *method_args,
+        indices: VecEnvIndices = None,
+        **method_kwargs,
+    ) -> list[Any]:
+        """Methods are shared by all slots"""
+        method = getattr(self, method_name)
+        return [
+            method(*method_args, **method_kwargs) for _ in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(
+        self, wrapper_class: type, indices: VecEnvIndices = None
+    ) -> list[bool]:
+        """Slots are never wrapped"""
+        return [False for _ in self._get_indices(indices)]
+
+    def seed(self, seed: int | None = None) -> Sequence[int | None]:
+        """Seed the shared random generator at the next reset"""
+        self._seeds = [seed] + [None] * (self.num_envs - 1)
+        return self._seeds
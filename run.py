@@ -1,10 +1,32 @@
 """Run the game"""
 
 import os
+import sys
+import time
 import argparse
+import asyncio
+from typing import Any, Callable
 
+import numpy as np
+
+from pdilem import bench
 from pdilem.actors.abstracts import Actor
+from pdilem.actors.drl import PolicyActor
+from pdilem.checkpoint import latest_checkpoint
+from pdilem.evaluation import evaluate, print_evaluation
+from pdilem.evolution import (
+    moran_process,
+    replicator_dynamics,
+    wright_fisher_process,
+)
 from pdilem.game import Game
+from pdilem.numpypolicy import export_model
+from pdilem.payoff import DEFAULT_PAYOFF_VALUES, payoff_table
+from pdilem.prefixcache import PrefixCache
+from pdilem.resultcache import ResultCache
+from pdilem.server import DEFAULT_PORT, MatchError, MatchServer, play_remote
+from pdilem.store import HistoryWriter
+from pdilem.tournament import round_robin
 from pdilem.actors import (
     ACActor,
     ADActor,
@@ -12,6 +34,7 @@ from pdilem.actors import (
     GTActor,
     GTFTActor,
     HumanActor,
+    NumpyDRLActor,
     RandActor,
     TFTActor,
 )
@@ -24,18 +47,51 @@ class ActorClosure:
         self.actor = actor
         self.name = name or actor.name
         self.model = model
+        # Depth of the opponent-move prefix cache given to model actors, if any
+        self.prefix_depth: int | None = None
+        # Shared by every actor built, as they all play the same model
+        self._prefix_cache: PrefixCache | None = None
 
-    def __call__(self, *args, **kwargs):
+    def __call__(self, *args, **kwargs: Any):
         if not kwargs:
             kwargs = {"name": self.name}
             if self.model:
                 kwargs["model"] = self.model
+            if self.prefix_depth is not None:
+                kwargs["prefix_cache"] = self.prefix_cache()
         return self.actor(*args, **kwargs)
 
+    def prefix_cache(self) -> PrefixCache:
+        """Return the prefix cache of the built actors, of depth `prefix_depth`"""
+        assert self.prefix_depth is not None, "No prefix cache depth set"
+        cache = self._prefix_cache
+        if cache is None or cache.max_depth != self.prefix_depth:
+            cache = self._prefix_cache = PrefixCache(max_depth=self.prefix_depth)
+        return cache
+
+    def __getstate__(self):
+        # Worker processes fill their own cache rather than receive a copy
+        state = self.__dict__.copy()
+        state["_prefix_cache"] = None
+        return state
+
+    def identity(self) -> str | None:
+        """Identity of the built actor, without loading its model if it has one"""
+        if self.model and issubclass(self.actor, PolicyActor):
+            return self.actor.file_identity(self.model)
+        return self().identity()
+
 
 class ActorPool:
-    def __init__(self, actors: list[ActorClosure]):
-        self.actors = actors
+    def __init__(self, actors: list[ActorClosure] | Callable[[], list[ActorClosure]]):
+        """Actors may be given as a loader, called once when first needed"""
+        self._actors = actors
+
+    @property
+    def actors(self) -> list[ActorClosure]:
+        if callable(self._actors):
+            self._actors = self._actors()
+        return self._actors
 
     def __getitem__(self, name: str):
         for actor in self.actors:
@@ -46,20 +102,47 @@ class ActorPool:
     def __iter__(self):
         return iter(self.actors)
 
+    def __contains__(self, name: str):
+        return name in self.names
+
     @property
     def names(self):
         return [actor.name for actor in self.actors]
 
 
 model_dirs = ["test_models/", "saved_models/"]
-model_paths = [
-    os.path.join(d, f)
-    for d in model_dirs
-    if os.path.exists(os.path.join(d))
-    for f in os.listdir(d)
-    if os.path.isfile(os.path.join(d, f)) and f.endswith(".zip")
-]
-model_names = [os.path.basename(m).replace(".zip", "") for m in model_paths]
+
+
+def scan_models(extension: str) -> list[str]:
+    """Return the paths of the model files with an extension in the model directories"""
+    return [
+        os.path.join(d, f)
+        for d in model_dirs
+        if os.path.exists(os.path.join(d))
+        for f in os.listdir(d)
+        if os.path.isfile(os.path.join(d, f)) and f.endswith(extension)
+    ]
+
+
+def load_drl_actors() -> list[ActorClosure]:
+    """Scan the model directories for saved models"""
+    model_paths = scan_models(".zip")
+    model_names = [os.path.basename(m).replace(".zip", "") for m in model_paths]
+    return [
+        ActorClosure(DRLActor, name, model)
+        for name, model in zip(model_names, model_paths)
+    ]
+
+
+def load_numpy_actors() -> list[ActorClosure]:
+    """Scan the model directories for exported models, named with a -np suffix"""
+    model_paths = scan_models(".npz")
+    model_names = [os.path.basename(m).replace(".npz", "-np") for m in model_paths]
+    return [
+        ActorClosure(NumpyDRLActor, name, model)
+        for name, model in zip(model_names, model_paths)
+    ]
+
 
 logic_actors: list[type[Actor]] = [
     HumanActor,
@@ -80,30 +163,59 @@ default_opponent_actors: list[type[Actor]] = [
 ]
 
 logic_pool = ActorPool([ActorClosure(actor) for actor in logic_actors])
-drl_pool = ActorPool(
-    [
-        ActorClosure(DRLActor, name, model)
-        for name, model in zip(model_names, model_paths)
-    ]
+# Models are only looked up, and loaded, when a name is resolved
+drl_pool = ActorPool(load_drl_actors)
+numpy_pool = ActorPool(load_numpy_actors)
+model_pool = ActorPool(lambda: drl_pool.actors + numpy_pool.actors)
+combined_pool = ActorPool(
+    lambda: logic_pool.actors + drl_pool.actors + numpy_pool.actors
 )
-combined_pool = ActorPool(logic_pool.actors + drl_pool.actors)
 default_opponent_pool = ActorPool(
     [ActorClosure(actor) for actor in default_opponent_actors]
 )
 
 
+def resume_path(model_name: str) -> str | None:
+    """
+    Path to continue training a model from: its latest checkpoint if newer than
+    the model (e.g. after a crash), else the model, or None if neither exists
+    """
+    if model_name in drl_pool:
+        model_path = drl_pool[model_name].model
+        assert model_path is not None, "Model path is missing or corrupted"
+    else:
+        model_path = os.path.join(model_dirs[0], f"{model_name}.zip")
+    checkpoint = latest_checkpoint(model_path)
+    if checkpoint is not None:
+        return checkpoint
+    return model_path if model_name in drl_pool else None
+
+
 def train(
     model_name: str | None,
     existing_model_name: str | None,
     episode_len: int,
     total_timesteps: int,
     opponent_names: list[str],
+    n_envs: int,
+    n_workers: int,
+    start_method: str | None,
+    payoff: np.ndarray,
+    log_dir: str | None,
+    checkpoint_every: int,
+    keep_checkpoints: int,
+    history_len: int,
+    lookahead_depth: int,
+    expected_lookahead: bool,
+    history_store: str | None,
 ):
     """Train a DRL model"""
     existing_model_path = None
     if existing_model_name:
-        existing_model_path = drl_pool[existing_model_name].model
+        existing_model_path = resume_path(existing_model_name)
         assert existing_model_path is not None, "Model path is missing or corrupted"
+        if existing_model_path.endswith("_steps.zip"):
+            print(f"Resuming from checkpoint `{existing_model_path}`")
 
     new_model_name = model_name or existing_model_name
     assert new_model_name is not None, "Model name is missing"
@@ -116,16 +228,60 @@ def train(
         model=existing_model_path,
         episode_len=episode_len,
         opponents=opponent_set,
+        payoff=payoff,
+        lookahead_depth=lookahead_depth,
+        expected_lookahead=expected_lookahead,
+        # Existing models keep their own policy and observations
+        history_len=history_len,
+        feedforward=history_len > 0,
+    )
+    new_drl_agent.train(
+        save_path,
+        total_timesteps,
+        n_envs,
+        n_workers,
+        start_method,
+        log_dir,
+        checkpoint_every,
+        keep_checkpoints,
+        history_store,
     )
-    new_drl_agent.train(save_path, total_timesteps)
 
 
-def run(actor1_name: str, actor2_name: str, iterations: int):
-    """Run a game with two actors"""
+def run(
+    actor1_name: str,
+    actor2_name: str,
+    iterations: int,
+    payoff: np.ndarray,
+    history_store: str | None = None,
+    seed: int | None = None,
+):
+    """Run a game with two actors, headless if it is recorded in a history store"""
     actor1 = combined_pool[actor1_name]()
     actor2 = combined_pool[actor2_name]()
 
-    game = Game(actor1, actor2)
+    game = Game(actor1, actor2, payoff)
+
+    if history_store is not None:
+        seed = seed if seed is not None else time.time_ns() % 2**32
+        streams = np.random.SeedSequence(seed).spawn(2)
+        for actor, stream in zip((actor1, actor2), streams):
+            actor.seed(stream)
+        history = game.run_headless(iterations)
+        with HistoryWriter(history_store) as writer:
+            writer.append(
+                history.moves,
+                actors=[actor1.name, actor2.name],
+                models=[
+                    combined_pool[actor1_name].model,
+                    combined_pool[actor2_name].model,
+                ],
+                payoff=payoff.ravel().tolist(),
+                seed=seed,
+            )
+        game.print_status("Scores", key="total_score", unconditional=True)
+        print(f"Game recorded in `{history_store}`")
+        return
 
     try:
         game.run(iterations)
@@ -133,6 +289,190 @@ def run(actor1_name: str, actor2_name: str, iterations: int):
         print("\nGame interrupted")
 
 
+def play_round_robin(
+    actor_names: list[str],
+    matches: int,
+    iterations: int,
+    workers: int | None,
+    payoff: np.ndarray,
+    seed: int | None,
+    result_cache: str | None,
+):
+    """Play every pairing of actors, reusing the results stored in a cache file"""
+    factories = [combined_pool[name] for name in actor_names]
+    if result_cache is None:
+        return round_robin(
+            actor_names, factories, matches, iterations, workers, seed, payoff
+        )
+
+    with ResultCache(result_cache) as cache:
+        result = round_robin(
+            actor_names,
+            factories,
+            matches,
+            iterations,
+            workers,
+            seed,
+            payoff,
+            cache,
+            [factory.identity() for factory in factories],
+        )
+    print(f"Played {result.played} pairings, others read from {result_cache}")
+    return result
+
+
+def tournament(
+    actor_names: list[str],
+    matches: int,
+    iterations: int,
+    workers: int | None,
+    payoff: np.ndarray,
+    seed: int | None,
+    result_cache: str | None,
+):
+    """Run a round-robin tournament between actors"""
+    result = play_round_robin(
+        actor_names, matches, iterations, workers, payoff, seed, result_cache
+    )
+    result.print()
+
+
+def evolve(
+    actor_names: list[str],
+    matches: int,
+    iterations: int,
+    workers: int | None,
+    payoff: np.ndarray,
+    seed: int | None,
+    result_cache: str | None,
+    dynamics: str,
+    generations: int,
+    population: int,
+    selection: float,
+):
+    """Evolve a population of actors from their round-robin payoff matrix"""
+    # The pairwise payoff matrix is computed once for all generations
+    result = play_round_robin(
+        actor_names, matches, iterations, workers, payoff, seed, result_cache
+    )
+    n = len(actor_names)
+    record_every = max(generations, 1)
+
+    if dynamics == "replicator":
+        shares = replicator_dynamics(
+            result.scores, np.ones(n), generations, record_every
+        )[-1]
+    else:
+        counts = np.full(n, population // n)
+        counts[: population % n] += 1
+        process = moran_process if dynamics == "moran" else wright_fisher_process
+        final = process(result.scores, counts, generations, selection, record_every)[-1]
+        shares = final / final.sum()
+
+    print(f"\nPopulation shares after {generations} generations ({dynamics}):")
+    for i in np.argsort(-shares, kind="stable"):
+        print(f"\t{actor_names[i]}: {shares[i]:.4f}")
+    print()
+
+
+def evaluation(
+    model_name: str,
+    opponent_names: list[str],
+    iterations: int,
+    workers: int | None,
+    payoff: np.ndarray,
+    width: float,
+    confidence: float,
+    max_matches: int,
+):
+    """Evaluate a model against opponents with sequential stopping"""
+    estimates = evaluate(
+        model_pool[model_name],
+        opponent_names,
+        [combined_pool[name] for name in opponent_names],
+        iterations,
+        width,
+        confidence,
+        max_matches,
+        workers,
+        payoff=payoff,
+    )
+    print_evaluation(model_name, estimates)
+
+
+def export(model_name: str):
+    """Export a DRL model for torch-free play"""
+    model_path = drl_pool[model_name].model
+    assert model_path is not None, "Model path is missing or corrupted"
+    save_path = model_path.replace(".zip", ".npz")
+    export_model(model_path, save_path)
+    print(f"Model exported to `{save_path}`, play it as {model_name}-np")
+
+
+def serve(
+    host: str, port: int, round_timeout: float, max_games: int, payoff: np.ndarray
+):
+    """Host games for remote players against every non-human actor"""
+    factories = {
+        name: combined_pool[name]
+        for name in combined_pool.names
+        if name != HumanActor.name
+    }
+    server = MatchServer(factories, host, port, round_timeout, max_games, payoff)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped")
+
+
+def connect(actor_name: str, opponent_name: str, iterations: int, host: str, port: int):
+    """Play an actor in a game hosted by a match server"""
+    actor = combined_pool[actor_name]()
+    try:
+        score, other_score = asyncio.run(
+            play_remote(actor, opponent_name, iterations, host, port)
+        )
+    except (MatchError, OSError) as e:
+        print(f"Could not play: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nGame interrupted")
+        return
+    print(f"\nScores:\n\t{actor.name}: {score}\n\t{opponent_name}: {other_score}\n")
+
+
+def benchmark(
+    model_name: str | None,
+    quick: bool,
+    out_path: str | None,
+    baseline_path: str | None,
+    tolerance: float,
+):
+    """Run the benchmark suite, optionally saving it and comparing to a baseline"""
+    model_path = drl_pool[model_name].model if model_name else None
+    results = bench.run_benchmarks(model_path, quick)
+    bench.print_results(results)
+    if out_path is not None:
+        bench.save(results, out_path)
+        print(f"Results saved to `{out_path}`\n")
+    if baseline_path is not None:
+        rows = bench.compare(results, bench.load(baseline_path), tolerance)
+        bench.print_comparison(rows)
+        if any(status == "regression" for *_, status in rows):
+            sys.exit(1)
+
+
+def check_names(
+    parser: argparse.ArgumentParser, names: list[str] | None, pool: ActorPool
+):
+    """Resolve actor names against a pool, exiting with a usage error if unknown"""
+    for name in names or []:
+        if name not in pool:
+            parser.error(
+                f"unknown actor {name!r} (choose from {', '.join(pool.names)})"
+            )
+
+
 def main():
     """Main function"""
 
@@ -154,7 +494,56 @@ def main():
         type=str,
         metavar=("ACTOR1", "ACTOR2"),
         help="run a game with the two specified participating actors",
-        choices=combined_pool.names,
+    )
+    group1e.add_argument(
+        "--tournament",
+        nargs="*",
+        type=str,
+        metavar="ACTOR",
+        help="run a round-robin tournament between the specified actors "
+        "(default: all non-human actors)",
+    )
+    group1e.add_argument(
+        "--evolve",
+        nargs="*",
+        type=str,
+        metavar="ACTOR",
+        help="evolve a population of the specified actors from their tournament "
+        "payoffs (default: all non-human actors)",
+    )
+    group1e.add_argument(
+        "--export",
+        type=str,
+        metavar="MODEL_NAME",
+        help="export a model to NumPy weights, played without torch as MODEL_NAME-np",
+    )
+    group1e.add_argument(
+        "--evaluate",
+        type=str,
+        metavar="MODEL_NAME",
+        help="evaluate a model against the opponents of -o, playing matches "
+        "until the confidence interval of each mean score is narrow enough",
+    )
+    group1e.add_argument(
+        "--bench",
+        nargs="?",
+        const="",
+        type=str,
+        metavar="MODEL_NAME",
+        help="run the benchmark suite, including DRL benchmarks if a model is given",
+    )
+    group1e.add_argument(
+        "--serve",
+        action="store_true",
+        help="host games over TCP for remote players against all non-human actors",
+    )
+    group1e.add_argument(
+        "--connect",
+        nargs=2,
+        type=str,
+        metavar=("ACTOR", "OPPONENT"),
+        help="play the actor in a game hosted by --serve, against a server-side "
+        "actor or `remote` for the next remote player to connect",
     )
     group2 = parser.add_argument_group("Interchangeable running/training arguments")
     group2.add_argument(
@@ -164,13 +553,38 @@ def main():
         default=100,
         help="number of iterations in a game/episode (default: 100)",
     )
+    group2.add_argument(
+        "-p",
+        "--payoff",
+        type=int,
+        nargs=4,
+        default=list(DEFAULT_PAYOFF_VALUES),
+        metavar=("CC", "CD", "DC", "DD"),
+        help="scores for cooperate/cooperate, cooperate/defect, defect/cooperate "
+        f"and defect/defect (default: {' '.join(map(str, DEFAULT_PAYOFF_VALUES))})",
+    )
+    group2.add_argument(
+        "--prefix-cache",
+        type=int,
+        metavar="DEPTH",
+        help="cache trained models' moves by the opponent's moves so far, "
+        "up to this many rounds (default: disabled)",
+    )
+    group2.add_argument(
+        "--history-store",
+        type=str,
+        metavar="DIR",
+        help="record the moves of the game, or of every training episode, in a "
+        "history store with the agent names, model paths and seeds; games are "
+        "then run headless, not supported with --n-workers (default: disabled)",
+    )
     group3 = parser.add_argument_group("Training arguments")
     group3.add_argument(
         "-m",
         "--model-name",
         type=str,
         help="optional name of model to continue training, overwritten if -s is not used",
-        choices=drl_pool.names,
+        metavar="MODEL_NAME",
     )
     group3.add_argument(
         "-s",
@@ -191,30 +605,351 @@ def main():
         type=str,
         nargs="+",
         default=default_opponent_pool.names,
-        help=f"opponents to train against (default: {', '.join(default_opponent_pool.names)})",
-        choices=combined_pool.names,
+        metavar=("OPPONENT1", "OPPONENT2"),
+        help="opponents to train or evaluate against "
+        f"(default: {', '.join(default_opponent_pool.names)})",
+    )
+    group3.add_argument(
+        "--n-envs",
+        type=int,
+        default=1,
+        help="number of episodes to collect rollouts from in parallel (default: 1)",
+    )
+    group3.add_argument(
+        "--n-workers",
+        type=int,
+        default=0,
+        help="number of subprocess workers to collect rollouts with (default: 0, in-process)",
+    )
+    group3.add_argument(
+        "--start-method",
+        type=str,
+        choices=["fork", "forkserver", "spawn"],
+        help="multiprocessing start method for the rollout workers (default: platform default)",
+    )
+
+    group3.add_argument(
+        "--profile",
+        type=str,
+        metavar="LOG_DIR",
+        help="record per-stage environment and update timings in LOG_DIR, "
+        "as timing.csv and TensorBoard logs",
+    )
+    group3.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        metavar="TIMESTEPS",
+        help="checkpoint the model in the background every this many timesteps, "
+        "-m resumes from the latest checkpoint (default: 0, disabled)",
+    )
+    group3.add_argument(
+        "--keep-checkpoints",
+        type=int,
+        default=3,
+        metavar="K",
+        help="number of most recent checkpoints to keep (default: 3)",
+    )
+    group3.add_argument(
+        "--history",
+        type=int,
+        default=0,
+        metavar="K",
+        help="train a new model as a feed-forward policy observing the last K rounds "
+        "instead of a recurrent one (default: 0, recurrent)",
+    )
+    group3.add_argument(
+        "--lookahead-depth",
+        type=int,
+        default=0,
+        metavar="DEPTH",
+        help="shape rewards with the optimal score over the next DEPTH rounds "
+        "against cloneable opponents (default: 0, no shaping)",
+    )
+    group3.add_argument(
+        "--expected-lookahead",
+        action="store_true",
+        help="shape rewards with the optimal expected score against stochastic "
+        "finite-state-machine opponents rather than a one-sample estimate",
+    )
+    group4 = parser.add_argument_group("Tournament and evolution arguments")
+    group4.add_argument(
+        "-n",
+        "--repetitions",
+        type=int,
+        default=10,
+        help="number of matches per pairing (default: 10)",
+    )
+    group4.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="number of worker processes (default: one per core)",
+    )
+    group4.add_argument(
+        "--seed",
+        type=int,
+        help="seed from which every pairing's seed is derived, or the game's "
+        "with -r and --history-store (default: random)",
+    )
+    group4.add_argument(
+        "--result-cache",
+        type=str,
+        metavar="FILE",
+        help="SQLite file of pairing results: pairings already in it are not "
+        "played again, new ones are added (requires --seed)",
+    )
+
+    group5 = parser.add_argument_group("Evolution arguments")
+    group5.add_argument(
+        "--dynamics",
+        type=str,
+        choices=["replicator", "moran", "wright-fisher"],
+        default="replicator",
+        help="population dynamics to run (default: replicator)",
+    )
+    group5.add_argument(
+        "-g",
+        "--generations",
+        type=int,
+        default=10_000,
+        help="number of generations to run, single birth-death events for the Moran "
+        "process (default: 10,000)",
+    )
+    group5.add_argument(
+        "--population",
+        type=int,
+        default=100,
+        help="population size for the Moran and Wright-Fisher processes "
+        "(default: 100)",
+    )
+    group5.add_argument(
+        "--selection",
+        type=float,
+        default=1.0,
+        help="intensity of selection in [0, 1] for the Moran and Wright-Fisher "
+        "processes (default: 1.0)",
+    )
+    group_eval = parser.add_argument_group("Evaluation arguments")
+    group_eval.add_argument(
+        "--ci-width",
+        type=float,
+        default=2.0,
+        help="target width of the confidence interval of the mean score per match "
+        "(default: 2.0)",
+    )
+    group_eval.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="confidence level of the intervals (default: 0.95)",
+    )
+    group_eval.add_argument(
+        "--max-matches",
+        type=int,
+        default=1024,
+        help="maximum number of matches per opponent, at least 2 (default: 1,024)",
+    )
+    group6 = parser.add_argument_group("Benchmark arguments")
+    group6.add_argument(
+        "--bench-out",
+        type=str,
+        metavar="FILE",
+        help="write the benchmark results to a JSON file",
+    )
+    group6.add_argument(
+        "--baseline",
+        type=str,
+        metavar="FILE",
+        help="compare against earlier results, exiting with status 1 on regressions",
+    )
+    group6.add_argument(
+        "--tolerance",
+        type=float,
+        default=bench.DEFAULT_TOLERANCE,
+        help="relative change in time per operation treated as noise "
+        f"(default: {bench.DEFAULT_TOLERANCE})",
+    )
+    group6.add_argument(
+        "--quick",
+        action="store_true",
+        help="run smaller benchmark workloads",
+    )
+
+    group7 = parser.add_argument_group("Server arguments")
+    group7.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="address to serve on or connect to (default: 127.0.0.1)",
+    )
+    group7.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"port to serve on or connect to (default: {DEFAULT_PORT})",
+    )
+    group7.add_argument(
+        "--round-timeout",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help="time remote players have to move, cooperating otherwise (default: 30)",
+    )
+    group7.add_argument(
+        "--max-games",
+        type=int,
+        default=1000,
+        help="maximum number of games played at once, "
+        "later players wait (default: 1,000)",
     )
 
     args = parser.parse_args()
 
+    check_names(parser, args.run, combined_pool)
+    check_names(parser, args.tournament, combined_pool)
+    check_names(parser, args.evolve, combined_pool)
+    check_names(parser, args.opponents, combined_pool)
+    if args.model_name is not None and resume_path(args.model_name) is None:
+        check_names(parser, [args.model_name], drl_pool)
+    check_names(parser, args.export and [args.export], drl_pool)
+    check_names(parser, args.bench and [args.bench], drl_pool)
+    check_names(parser, args.evaluate and [args.evaluate], model_pool)
+    check_names(parser, args.connect and args.connect[:1], combined_pool)
+
     train_: bool = args.train
     run_: tuple[str, str] | None = args.run
     iterations: int = args.iterations
+    payoff = payoff_table(args.payoff)
     model_name: str | None = args.model_name
     save_as: str | None = args.save_as
     total_timesteps: int = args.total_timesteps
     opponents: list[str] = args.opponents
+    n_envs: int = args.n_envs
+    n_workers: int = args.n_workers
+    start_method: str | None = args.start_method
+    tournament_: list[str] | None = args.tournament
+    repetitions: int = args.repetitions
+    workers: int | None = args.workers
+    seed: int | None = args.seed
+    result_cache: str | None = args.result_cache
+    evolve_: list[str] | None = args.evolve
+    dynamics: str = args.dynamics
+    generations: int = args.generations
+    population: int = args.population
+    selection: float = args.selection
+    export_: str | None = args.export
+    bench_: str | None = args.bench
+    evaluate_: str | None = args.evaluate
+
+    if args.prefix_cache is not None:
+        for closure in drl_pool.actors + numpy_pool.actors:
+            closure.prefix_depth = args.prefix_cache
 
     if train_:
         if model_name is None and save_as is None:
             parser.error("at least one of -m or -s is required for training")
-        train(save_as, model_name, iterations, total_timesteps, opponents)
+        if n_envs > 1 and n_workers > 0:
+            parser.error("--n-envs and --n-workers are mutually exclusive")
+        if args.keep_checkpoints < 1:
+            parser.error("--keep-checkpoints must be at least 1")
+        if args.lookahead_depth < 0:
+            parser.error("--lookahead-depth must be at least 0")
+        if args.expected_lookahead and args.lookahead_depth == 0:
+            parser.error("--expected-lookahead requires --lookahead-depth")
+        if args.history_store is not None and n_workers > 0:
+            parser.error("--history-store is not supported with --n-workers")
+        train(
+            save_as,
+            model_name,
+            iterations,
+            total_timesteps,
+            opponents,
+            n_envs,
+            n_workers,
+            start_method,
+            payoff,
+            args.profile,
+            args.checkpoint_every,
+            args.keep_checkpoints,
+            args.history,
+            args.lookahead_depth,
+            args.expected_lookahead,
+            args.history_store,
+        )
 
     elif run_ is not None:
         actor1, actor2 = run_
         if model_name is not None or save_as is not None:
             parser.error("model name and save as are not required for running")
-        run(actor1, actor2, iterations)
+        if args.history_store is not None and HumanActor.name in run_:
+            parser.error("games with human actors cannot be run headless")
+        run(actor1, actor2, iterations, payoff, args.history_store, seed)
+
+    elif export_ is not None:
+        export(export_)
+
+    elif evaluate_ is not None:
+        if HumanActor.name in opponents:
+            parser.error("human actors cannot be evaluated against")
+        if args.max_matches < 2:
+            parser.error("--max-matches must be at least 2")
+        evaluation(
+            evaluate_,
+            opponents,
+            iterations,
+            workers,
+            payoff,
+            args.ci_width,
+            args.confidence,
+            args.max_matches,
+        )
+
+    elif bench_ is not None:
+        benchmark(
+            bench_ or None, args.quick, args.bench_out, args.baseline, args.tolerance
+        )
+
+    elif args.serve:
+        serve(args.host, args.port, args.round_timeout, args.max_games, payoff)
+
+    elif args.connect is not None:
+        actor, opponent = args.connect
+        connect(actor, opponent, iterations, args.host, args.port)
+
+    else:
+        actor_names = (tournament_ or evolve_) or [
+            name for name in combined_pool.names if name != HumanActor.name
+        ]
+        if HumanActor.name in actor_names:
+            parser.error("human actors cannot take part in a tournament")
+        if result_cache is not None and seed is None:
+            parser.error("--result-cache requires --seed")
+
+        if tournament_ is not None:
+            tournament(
+                actor_names,
+                repetitions,
+                iterations,
+                workers,
+                payoff,
+                seed,
+                result_cache,
+            )
+        else:
+            evolve(
+                actor_names,
+                repetitions,
+                iterations,
+                workers,
+                payoff,
+                seed,
+                result_cache,
+                dynamics,
+                generations,
+                population,
+                selection,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+"""Vectorized games against the reference `Game` loop"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from pdilem.actors import ACActor, ADActor, GTActor, GTFTActor, TFTActor
+from pdilem.batchgame import BatchGame
+from pdilem.game import Game
+
+ROUNDS = 50
+
+
+@pytest.mark.parametrize(
+    "cls1, cls2, expected",
+    [
+        (TFTActor, ADActor, (49, 52)),
+        (GTActor, TFTActor, (100, 100)),
+        (ACActor, GTActor, (100, 100)),
+    ],
+)
+def test_deterministic_pairings(cls1, cls2, expected):
+    assert Game(cls1(), cls2()).run_headless(ROUNDS).totals == expected
+    scores1, scores2 = BatchGame([(cls1(), cls2())], matches=3).run(ROUNDS)
+    assert (scores1 == expected[0]).all() and (scores2 == expected[1]).all()
+
+
+def test_shared_prototypes_match_game():
+    # Every prototype plays in several pairings, on both sides
+    prototypes = [TFTActor(), ADActor(), ACActor(), GTActor()]
+    pairings = list(itertools.product(prototypes, repeat=2))
+    scores1, scores2 = BatchGame(pairings, matches=2).run(ROUNDS)
+    for p, (actor1, actor2) in enumerate(pairings):
+        expected = Game(type(actor1)(), type(actor2)()).run_headless(ROUNDS).totals
+        assert (scores1[p] == expected[0]).all() and (scores2[p] == expected[1]).all()
+
+
+def test_stochastic_means():
+    matches = 2000
+    scores1, scores2 = BatchGame([(GTFTActor(), ADActor())], matches, seed=0).run(
+        ROUNDS
+    )
+    totals = np.array(
+        [
+            Game(GTFTActor(seed=i), ADActor()).run_headless(ROUNDS).totals
+            for i in range(matches)
+        ]
+    )
+    # GTFT defects back nine times in ten after the first round
+    expected = (ROUNDS - 1) * 0.9  # 44.1
+    # Standard errors of the means are about 0.05 for GTFT, 0.1 for AD
+    assert abs(scores1.mean() - expected) < 0.25
+    assert abs(totals[:, 0].mean() - expected) < 0.25
+    assert abs(scores2.mean() - totals[:, 1].mean()) < 0.6
@@ -0,0 +1,27 @@
+"""Finite-population dynamics"""
+
+import numpy as np
+
+from pdilem.evolution import moran_process, wright_fisher_process
+
+PAYOFF = np.array([[3.0, 0.0], [5.0, 1.0]])
+
+
+def test_population_size_is_kept():
+    counts = np.array([[1, 9], [5, 5]])
+    for process in (moran_process, wright_fisher_process):
+        recorded = process(PAYOFF, counts, 200, seed=0)
+        assert (recorded.sum(axis=2) == counts.sum(axis=1)).all()
+        assert (recorded >= 0).all()
+
+
+def test_records_after_fixation():
+    recorded = wright_fisher_process(PAYOFF, np.array([0, 50]), 100, record_every=10)
+    assert recorded.shape == (11, 2)
+    assert (recorded == [0, 50]).all()
+
+
+def test_wright_fisher_selection():
+    # Defectors take over a large population under strong selection
+    final = wright_fisher_process(PAYOFF, np.array([5000, 5000]), 1000, seed=0)[-1]
+    assert (final == [0, 10000]).all()
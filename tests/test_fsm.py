@@ -0,0 +1,37 @@
+"""Finite-state-machine actors"""
+
+import pickle
+
+import pytest
+
+from pdilem.actors import ADActor, GTFTActor, RandActor, TFTActor
+from pdilem.actors.fsm import FSM, FSMActor
+from pdilem.game import Game
+
+
+@pytest.mark.parametrize("cls", [TFTActor, GTFTActor, ADActor, RandActor])
+def test_no_instance_dict(cls):
+    actor = cls(name="renamed", verbose=True)
+    assert not hasattr(actor, "__dict__")
+    assert (actor.name, actor.verbose) == ("renamed", True)
+    # Class defaults are untouched
+    assert cls().name == cls.name != "renamed" and cls.verbose is False
+
+
+def test_overrides():
+    game = Game(TFTActor(), TFTActor())
+    assert (game.actor1.name, game.actor2.name) == ("TFT1", "TFT2")
+    assert TFTActor.name == "TFT"
+    actor = GTFTActor(verbose=True, seed=1)
+    assert actor.clone().verbose is False and actor.verbose is True
+    rand = RandActor(cprob=0.25)
+    assert rand.fsm is not RandActor().fsm and list(rand.fsm.defect_probs) == [0.75]
+    fsm = FSM([[0, 1], [0, 1]], defect_probs=[0.0, 1.0])
+    assert FSMActor(fsm=fsm).fsm is fsm and FSMActor.name == "FSM"
+
+
+def test_pickle():
+    actor = RandActor(name="r", cprob=0.25, seed=1)
+    copied = pickle.loads(pickle.dumps(actor))
+    assert (copied.name, copied.cprob, copied.fsm) == ("r", 0.25, actor.fsm)
+    assert [copied.move() for _ in range(20)] == [actor.move() for _ in range(20)]
@@ -0,0 +1,103 @@
+"""Lookahead searches against stochastic opponents"""
+
+import math
+
+import pytest
+
+from pdilem.actors import ACActor, ADActor, GTActor, GTFTActor, RandActor, TFTActor
+from pdilem.actors.abstracts import Actor, Move
+from pdilem.lookahead import Lookahead
+from pdilem.payoff import PAYOFF
+
+
+def moves(actor, rounds=20):
+    """Moves of an actor against a cooperator"""
+    played = []
+    for _ in range(rounds):
+        played.append(actor.move())
+        actor.result(Move.COOPERATE, 0)
+    return played
+
+
+def test_clone_has_own_stream():
+    actor = RandActor(seed=1)
+    assert actor.clone().rng is not actor.rng
+
+
+def test_lookahead_leaves_opponent_stream():
+    for cls in (RandActor, GTFTActor):
+        opponent = cls(seed=1)
+        Lookahead().optimal_score(opponent, 6)
+        assert moves(opponent) == moves(cls(seed=1))
+
+
+def reference_score(opponent, remaining, payoff=PAYOFF):
+    """Optimal score against a deterministic opponent, cloning it at every node"""
+    if remaining <= 0:
+        return 0
+    best = 0
+    for self_move in (Move.COOPERATE, Move.DEFECT):
+        branch = opponent.clone()
+        opponent_move = branch.move()
+        branch.result(self_move, int(payoff[opponent_move, self_move]))
+        score = int(payoff[self_move, opponent_move])
+        best = max(best, score + reference_score(branch, remaining - 1, payoff))
+    return best
+
+
+def test_snapshot_search_matches_cloning():
+    for cls in (TFTActor, GTActor, ADActor, ACActor):
+        opponent = cls()
+        opponent.result(Move.DEFECT, 0)
+        assert Lookahead().optimal_score(opponent, 8) == reference_score(opponent, 8)
+
+
+def test_stochastic_search_is_reproducible():
+    for cls in (RandActor, GTFTActor):
+        scores = [Lookahead().optimal_score(cls(seed=1), 8) for _ in range(2)]
+        assert scores[0] == scores[1]
+
+
+def expected_reference(opponent, remaining, payoff=PAYOFF):
+    """Optimal expected score against a finite-state machine, branch by branch"""
+    if remaining <= 0:
+        return 0.0
+    defect = opponent.fsm.defect_probs[opponent.state]
+    best = -math.inf
+    for self_move in (Move.COOPERATE, Move.DEFECT):
+        branch = opponent.clone()
+        branch.result(self_move, 0)
+        score = (1 - defect) * payoff[self_move, Move.COOPERATE] + defect * payoff[
+            self_move, Move.DEFECT
+        ]
+        best = max(best, score + expected_reference(branch, remaining - 1, payoff))
+    return best
+
+
+def test_expected_search_matches_branching():
+    for cls in (RandActor, GTFTActor):
+        opponent = cls()
+        score = Lookahead(expected=True).optimal_score(opponent, 6)
+        assert math.isclose(score, expected_reference(opponent, 6))
+
+
+class CoinActor(Actor):
+    """Stochastic actor that is not a finite-state machine"""
+
+    name = "Coin"
+    verbose = False
+    cloneable = True
+
+    def move(self):
+        return Move.DEFECT
+
+    def result(self, other, delta_score):
+        pass
+
+    def reset(self):
+        pass
+
+
+def test_expected_search_needs_fsm():
+    with pytest.raises(ValueError):
+        Lookahead(expected=True).optimal_score(CoinActor(), 3)
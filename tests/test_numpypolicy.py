@@ -0,0 +1,56 @@
+"""Torch-free inference of exported policies"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sb3_contrib")
+
+import torch  # noqa: E402
+from sb3_contrib import RecurrentPPO  # noqa: E402
+
+from pdilem.actors import TFTActor  # noqa: E402
+from pdilem.env import PDEnv  # noqa: E402
+from pdilem.numpypolicy import NumpyPolicy, export_model  # noqa: E402
+
+
+@pytest.mark.parametrize("n_lstm_layers", [1, 2])
+def test_matches_recurrent_ppo(tmp_path, n_lstm_layers):
+    model = RecurrentPPO(
+        "MlpLstmPolicy",
+        PDEnv(TFTActor()),
+        policy_kwargs={"lstm_hidden_size": 8, "n_lstm_layers": n_lstm_layers},
+        seed=0,
+    )
+    # Unit-scale weights, so a fresh policy does not pick one action everywhere
+    generator = torch.Generator().manual_seed(4)
+    with torch.no_grad():
+        for parameter in model.policy.parameters():
+            parameter.normal_(generator=generator)
+    model.save(tmp_path / "tiny.zip")
+    export_model(str(tmp_path / "tiny.zip"), str(tmp_path / "tiny.npz"))
+    policy = NumpyPolicy(str(tmp_path / "tiny.npz"))
+    assert policy.lstm_hidden_state_shape == model.policy.lstm_hidden_state_shape
+
+    rng = np.random.default_rng(0)
+    games = 16
+    state = numpy_state = None
+    actions = []
+    for step in range(20):
+        observation = rng.integers(3, size=games)
+        # Every game starts with a new episode, later some start over
+        episode_start = (
+            np.ones(games, dtype=bool) if step == 0 else rng.random(games) < 0.2
+        )
+        action, state = model.predict(
+            observation, state=state, episode_start=episode_start, deterministic=True
+        )
+        numpy_action, numpy_state = policy.predict(
+            observation, state=numpy_state, episode_start=episode_start
+        )
+        actions.append(action)
+        assert (numpy_action == action).all()
+        assert state is not None
+        np.testing.assert_allclose(numpy_state[0], state[0], atol=1e-5)
+        np.testing.assert_allclose(numpy_state[1], state[1], atol=1e-5)
+    # Both actions were compared
+    assert len(np.unique(actions)) == 2
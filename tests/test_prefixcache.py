@@ -0,0 +1,44 @@
+"""Prefix-cached policy moves"""
+
+import pytest
+
+pytest.importorskip("sb3_contrib")
+
+from sb3_contrib import RecurrentPPO  # noqa: E402
+
+from pdilem.actors import ADActor, DRLActor, RandActor, TFTActor  # noqa: E402
+from pdilem.batchgame import BatchGame  # noqa: E402
+from pdilem.env import PDEnv  # noqa: E402
+from pdilem.prefixcache import PrefixCache  # noqa: E402
+
+
+class CountingModel:
+    """Model wrapper counting the games run through the network"""
+
+    def __init__(self, model):
+        self.model = model
+        self.policy = model.policy
+        self.observation_space = model.observation_space
+        self.games = 0
+
+    def predict(self, observation, **kwargs):
+        self.games += len(observation)
+        return self.model.predict(observation, **kwargs)
+
+
+def play(model, prefix_cache):
+    drl = DRLActor(model=model, prefix_cache=prefix_cache)
+    pairings = [(drl, TFTActor()), (drl, ADActor()), (drl, RandActor())]
+    return BatchGame(pairings, matches=8, seed=0).run(10)
+
+
+def test_misses_run_once_per_prefix():
+    model = RecurrentPPO("MlpLstmPolicy", PDEnv(TFTActor()), seed=0)
+    uncached, cached = CountingModel(model), CountingModel(model)
+    expected = play(uncached, None)
+    scores = play(cached, PrefixCache())
+    assert all((a == b).all() for a, b in zip(scores, expected))
+    assert uncached.games == 3 * 8 * 10
+    # The matches against TFT and AD follow one prefix each, only those against
+    # Rand may all differ
+    assert cached.games <= (1 + 1 + 8) * 10
@@ -0,0 +1,139 @@
+"""Games served over TCP"""
+
+import asyncio
+
+import pytest
+
+from pdilem.actors import ACActor, ADActor, GTActor, TFTActor
+from pdilem.game import Game
+from pdilem.server import REMOTE, MatchError, MatchServer, play_remote, receive, send
+
+FACTORIES = {"TFT": TFTActor, "AD": ADActor}
+
+
+async def serving(coroutine_fn, **kwargs):
+    """Run a coroutine function with a started server on a free port"""
+    server = MatchServer(kwargs.pop("factories", FACTORIES), port=0, **kwargs)
+    await server.start()
+    try:
+        return await coroutine_fn(server)
+    finally:
+        await server.close()
+
+
+async def join(server, **request):
+    """Connect a raw client and send a join request"""
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    await send(writer, {"type": "join", **request})
+    return reader, writer
+
+
+def test_logic_opponent():
+    async def main(server):
+        return await play_remote(ADActor(), "TFT", 10, port=server.port)
+
+    assert asyncio.run(serving(main)) == (12, 9)
+
+
+def test_remote_opponent():
+    async def main(server):
+        first = asyncio.create_task(
+            play_remote(ACActor(), REMOTE, 10, port=server.port)
+        )
+        # The first player is waiting in the lobby before the second joins
+        await asyncio.sleep(0.1)
+        second = await play_remote(GTActor(), REMOTE, 5, port=server.port)
+        return await first, second, server.games_played
+
+    first, second, played = asyncio.run(serving(main))
+    # The game has the waiting player's number of rounds
+    assert first == (20, 20) and second == (20, 20) and played == 1
+
+
+def test_round_timeout():
+    async def main(server):
+        reader, writer = await join(server, name="idle", opponent="AD", rounds=2)
+        messages = []
+        while not messages or messages[-1]["type"] != "end":
+            messages.append(await receive(reader))
+        writer.close()
+        return messages
+
+    messages = asyncio.run(serving(main, round_timeout=0.05))
+    results = [message for message in messages if message["type"] == "result"]
+    # Idle players cooperate
+    assert [result["timeout"] for result in results] == [True, True]
+    assert [result["move"] for result in results] == ["c", "c"]
+    assert messages[-1] == {"type": "end", "score": 0, "other_score": 6}
+
+
+def test_lobby_disconnect():
+    async def main(server):
+        reader, writer = await join(server, name="gone", opponent=REMOTE, rounds=3)
+        assert (await receive(reader))["type"] == "wait"
+        writer.close()
+        await asyncio.sleep(0.1)
+        # Nobody is left to play, so this player waits for the next one
+        first = asyncio.create_task(play_remote(ACActor(), REMOTE, 3, port=server.port))
+        await asyncio.sleep(0.1)
+        assert not first.done()
+        second = await play_remote(ADActor(), REMOTE, 3, port=server.port)
+        return await first, second, server.games_played, server.games_aborted
+
+    assert asyncio.run(serving(main)) == ((0, 9), (9, 0), 1, 0)
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"name": "x", "opponent": "TFT", "rounds": True},
+        {"name": "x", "opponent": "TFT", "rounds": 0},
+        {"name": "x", "opponent": "nobody", "rounds": 3},
+        {"name": "x", "opponent": 3, "rounds": 3},
+        {"opponent": "TFT", "rounds": 3},
+    ],
+)
+def test_invalid_join(request_):
+    async def main(server):
+        reader, writer = await join(server, **request_)
+        message = await receive(reader)
+        writer.close()
+        return message
+
+    assert asyncio.run(serving(main))["type"] == "error"
+
+
+def test_policy_moves_are_batched():
+    pytest.importorskip("sb3_contrib")
+    from sb3_contrib import RecurrentPPO
+
+    from pdilem.actors import DRLActor
+    from pdilem.env import PDEnv
+
+    model = RecurrentPPO("MlpLstmPolicy", PDEnv(TFTActor()), seed=0)
+    factories = {"DRL": lambda: DRLActor(model=model)}
+    opponents = [ACActor, ADActor, TFTActor, GTActor] * 2
+    rounds = 8
+
+    async def main(server):
+        scores = await asyncio.gather(
+            *(
+                play_remote(opponent(), "DRL", rounds, port=server.port)
+                for opponent in opponents
+            )
+        )
+        return scores, server.batcher.passes
+
+    scores, passes = asyncio.run(serving(main, factories=factories))
+    for opponent, score in zip(opponents, scores):
+        game = Game(opponent(), DRLActor(model=model))
+        assert score == game.run_headless(rounds).totals
+    assert passes < len(opponents) * rounds
+
+
+def test_play_remote_raises_server_errors():
+    async def main(server):
+        return await play_remote(ADActor(), "nobody", 3, port=server.port)
+
+    with pytest.raises(MatchError):
+        asyncio.run(serving(main))
@@ -0,0 +1,82 @@
+"""Match history stores"""
+
+import numpy as np
+import pytest
+
+from pdilem.actors import GTFTActor, TFTActor
+from pdilem.store import HistoryReader, HistoryWriter, pack_moves, unpack_moves
+
+
+def random_matches(seed=0, count=20):
+    """Random moves of matches of varying lengths, including empty ones"""
+    rng = np.random.default_rng(seed)
+    return [
+        rng.integers(2, size=(rounds, 2)).astype(np.int8)
+        for rounds in rng.integers(0, 30, size=count)
+    ]
+
+
+def test_pack_round_trip():
+    for moves in random_matches():
+        assert (unpack_moves(pack_moves(moves), len(moves)) == moves).all()
+
+
+def test_unpack_matches_per_match_reads(tmp_path):
+    matches = random_matches()
+    with HistoryWriter(str(tmp_path)) as writer:
+        for i, moves in enumerate(matches):
+            writer.append(moves, match=i)
+    reader = HistoryReader(str(tmp_path))
+    offsets = reader.round_offsets
+    assert offsets[-1] == reader.total_rounds == sum(map(len, matches))
+    moves = reader.unpack()
+    for i, expected in enumerate(matches):
+        assert (moves[offsets[i] : offsets[i + 1]] == expected).all()
+        assert (reader.moves(i) == expected).all()
+        assert reader.metadata(i) == {"match": i}
+    start, stop = 5, 12
+    assert (reader.unpack(start, stop) == np.concatenate(matches[start:stop])).all()
+    assert reader.unpack(3, 3).shape == (0, 2)
+
+
+def test_environments_record_episodes(tmp_path):
+    pytest.importorskip("stable_baselines3")
+    from pdilem.env import PDEnv
+    from pdilem.vecenv import PDVecEnv
+
+    metadata = {"agent": "agent", "model": "model.zip"}
+    with HistoryWriter(str(tmp_path)) as writer:
+        env = PDEnv(
+            [TFTActor(), GTFTActor()],
+            episode_len=5,
+            history_writer=writer,
+            history_metadata=metadata,
+        )
+        env.reset(seed=7)
+        for _ in range(2):
+            for _ in range(5):
+                env.step(1)
+            env.reset()
+        vec_env = PDVecEnv(
+            [TFTActor(), GTFTActor()],
+            episode_len=5,
+            num_envs=3,
+            history_writer=writer,
+            history_metadata=metadata,
+        )
+        vec_env.seed(11)
+        vec_env.reset()
+        for _ in range(10):
+            vec_env.step(np.ones(3, dtype=np.int64))
+    reader = HistoryReader(str(tmp_path))
+    assert len(reader) == 2 + 6
+    records = [reader.metadata(i) for i in range(len(reader))]
+    assert [(r["seed"], r["episode"]) for r in records[:2]] == [(7, 0), (7, 1)]
+    assert sorted(r["episode"] for r in records[2:]) == list(range(6))
+    for i, record in enumerate(records):
+        assert record["agent"] == "agent" and record["model"] == "model.zip"
+        assert (reader.moves(i)[:, 0] == 1).all()
+        if record["opponent"] == TFTActor.name:
+            # TFT cooperates once, then answers the defections
+            assert reader.moves(i)[:, 1].tolist() == [0, 1, 1, 1, 1]
+    assert {r["seed"] for r in records[2:]} == {11}
@@ -0,0 +1,97 @@
+"""Round-robin tournaments and their result cache"""
+
+import functools
+
+import pytest
+
+from pdilem.actors import ADActor, GTActor, GTFTActor, RandActor, TFTActor
+from pdilem.actors.drl import DRLActor
+from pdilem.payoff import PAYOFF, payoff_table
+from pdilem.resultcache import ResultCache, describe_pairing
+from pdilem.tournament import round_robin
+
+ACTORS = {
+    "TFT": TFTActor,
+    "AD": ADActor,
+    "GTFT": GTFTActor,
+    "Rand": RandActor,
+    "GT": GTActor,
+}
+
+
+def play(names, cache, seed: int | None = 1, payoff=PAYOFF):
+    """Play a cached round robin of the named actors"""
+    factories = [ACTORS[name] for name in names]
+    return round_robin(names, factories, 4, 10, 1, seed, payoff, cache)
+
+
+def pairing_scores(result):
+    """Mean scores of every ordered pairing of a tournament, by names"""
+    return {
+        (row, column): result.scores[i, j]
+        for i, row in enumerate(result.names)
+        for j, column in enumerate(result.names)
+    }
+
+
+def test_second_run_plays_nothing(tmp_path):
+    with ResultCache(str(tmp_path / "results.db")) as cache:
+        first = play(["TFT", "AD", "Rand"], cache)
+        second = play(["TFT", "AD", "Rand"], cache)
+    assert first.played == 6 and second.played == 0
+    assert (first.scores == second.scores).all()
+
+
+def test_results_do_not_depend_on_order_or_field(tmp_path):
+    with ResultCache(str(tmp_path / "results.db")) as cache:
+        first = play(["TFT", "GTFT", "Rand"], cache)
+        # Reordered, with another actor taking part
+        second = play(["GT", "Rand", "GTFT", "TFT"], cache)
+    # Only the pairings of the new actor are played
+    assert second.played == 4
+    with ResultCache(str(tmp_path / "uncached.db")) as cache:
+        third = play(["Rand", "GTFT", "TFT"], cache)
+    first_scores, third_scores = pairing_scores(first), pairing_scores(third)
+    second_scores = pairing_scores(second)
+    for pairing, score in first_scores.items():
+        assert second_scores[pairing] == score == third_scores[pairing]
+
+
+def test_settings_change_the_key():
+    def key(identity1, identity2, payoff=PAYOFF, seed=1):
+        return ResultCache.key(
+            describe_pairing(identity1, identity2, 4, 10, payoff, seed)
+        )
+
+    tft, rand = TFTActor().identity(), RandActor().identity()
+    assert tft is not None and rand is not None
+    base = key(tft, rand)
+    other_rand = RandActor(cprob=0.3).identity()
+    assert other_rand is not None and key(tft, other_rand) != base
+    assert key(tft, rand, payoff=payoff_table([3, 0, 5, 1])) != base
+    assert key(tft, rand, seed=2) != base
+
+
+def test_model_file_changes_the_identity(tmp_path):
+    path = tmp_path / "model.zip"
+    path.write_bytes(b"weights")
+    before = DRLActor.file_identity(str(path))
+    path.write_bytes(b"other weights")
+    assert DRLActor.file_identity(str(path)) != before
+
+
+def test_cache_needs_a_seed(tmp_path):
+    with ResultCache(str(tmp_path / "results.db")) as cache:
+        with pytest.raises(ValueError):
+            play(["TFT", "AD"], cache, seed=None)
+
+
+def test_cached_rand_actors_differ_by_cprob(tmp_path):
+    factories = [RandActor, functools.partial(RandActor, cprob=1.0)]
+    with ResultCache(str(tmp_path / "results.db")) as cache:
+        result = round_robin(
+            ["Rand", "Cooperative"], factories, 4, 10, 1, 1, PAYOFF, cache
+        )
+    # Both are played against each other and themselves, not read as one actor
+    assert result.played == 3
+    assert result.scores[1, 1] == 2 * 10 and result.scores[1, 0] < 2 * 10
@@ -0,0 +1,65 @@
+"""Short training runs"""
+
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from stable_baselines3.common.vec_env import VecEnv  # noqa: E402
+
+from pdilem.actors import DRLActor, GTFTActor  # noqa: E402
+from pdilem.env import PDEnv  # noqa: E402
+from pdilem.store import HistoryReader  # noqa: E402
+
+
+@pytest.mark.parametrize("n_envs, n_workers", [(1, 0), (2, 0), (1, 2)])
+def test_expected_lookahead_shapes_training(tmp_path, n_envs, n_workers):
+    actor = DRLActor(
+        "expected",
+        opponents=[GTFTActor()],
+        episode_len=8,
+        lookahead_depth=4,
+        expected_lookahead=True,
+        history_len=2,
+        feedforward=True,
+    )
+    actor.train(str(tmp_path / "expected.zip"), 16, n_envs, n_workers)
+    env = actor.env
+    if isinstance(env, PDEnv):
+        lookaheads = [env._lookahead]
+    else:
+        assert isinstance(env, VecEnv)
+        lookaheads = env.get_attr("_lookahead")
+    for lookahead in lookaheads:
+        assert lookahead.expected
+        # Shaped rewards went through the exact expectation over GTFT's moves
+        assert lookahead._fsm_values
+
+
+@pytest.mark.parametrize("n_envs", [1, 2])
+def test_training_records_episodes(tmp_path, n_envs):
+    actor = DRLActor(
+        "recorded",
+        opponents=[GTFTActor()],
+        episode_len=8,
+        history_len=2,
+        feedforward=True,
+    )
+    save_path = str(tmp_path / "recorded.zip")
+    actor.train(save_path, 16, n_envs, history_store=str(tmp_path / "history"))
+    reader = HistoryReader(str(tmp_path / "history"))
+    assert len(reader) > 0
+    assert (reader.index["rounds"] == 8).all()
+    record = reader.metadata(len(reader) - 1)
+    assert record["agent"] == "recorded" and record["model"] == save_path
+    assert record["opponent"] == GTFTActor.name and "seed" in record
+
+
+def test_workers_cannot_record_episodes(tmp_path):
+    actor = DRLActor("recorded", opponents=[GTFTActor()], episode_len=8)
+    with pytest.raises(ValueError):
+        actor.train(
+            str(tmp_path / "recorded.zip"),
+            16,
+            n_workers=2,
+            history_store=str(tmp_path / "history"),
+        )